@@ -0,0 +1,156 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Solves many n-sudokus at once, spreading them over a pool of worker
+	processes which live as long as the pool does, so every cache kept by
+	a worker (structural constraints, shared solvers) stays warm between
+	puzzles.
+	---------------------------------------------------------------
+'''
+from nsudoku import Sudoku
+from propagation import propagate_many, SOLVED, CONTRADICTION
+from linear_programming_solver import STATUS_OPTIMAL, STATUS_INFEASIBLE
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import numpy as np
+import os
+import time
+
+
+_worker_threads = 1
+
+
+def _init_worker(num_threads):
+	'''
+	output:
+	------
+		* sets the number of threads each solve may use inside this worker process;
+	'''
+	global _worker_threads
+	_worker_threads = num_threads
+
+
+def _solve_chunk(first, puzzles, engine, presolve=False):
+	'''
+	output:
+	------
+		* returns a list of 4-uples (index, solved sudoku state, status, time spent in
+			milliseconds), one for each puzzle in 'puzzles', numbered from 'first' onwards;
+			if 'presolve' is True, the whole chunk is propagated at once first (see
+			'propagation.propagate_many') and only the puzzles it left stuck are given
+			to the engine, the time spent propagating being split evenly among them all;
+	'''
+	if presolve:
+		return _presolve_chunk(first, puzzles, engine)
+	results = []
+	for index, puzzle in enumerate(puzzles, start=first):
+		sudoku = Sudoku(puzzle.copy(), n=puzzle.shape[0])
+		_, _, status, time_spent = sudoku.solve(engine=engine, num_threads=_worker_threads)
+		results.append((index, sudoku.get_puzzle_state(), status, time_spent))
+	return results
+
+
+def _presolve_chunk(first, puzzles, engine):
+	'''
+	output:
+	------
+		* the outputs of '_solve_chunk', for a chunk of puzzles sharing the same n;
+	'''
+	start = time.perf_counter()
+	grids, _, statuses = propagate_many(np.stack(puzzles))
+	share = int(round((time.perf_counter() - start) * 1000 / len(puzzles)))
+
+	results = []
+	for index, grid, status in zip(range(first, first + len(puzzles)), grids, statuses):
+		if status == SOLVED:
+			results.append((index, grid, STATUS_OPTIMAL, share))
+		elif status == CONTRADICTION:
+			results.append((index, grid, STATUS_INFEASIBLE, share))
+		else:
+			sudoku = Sudoku(grid, n=grid.shape[0])
+			_, _, status, time_spent = sudoku.solve(engine=engine, num_threads=_worker_threads)
+			results.append((index, sudoku.get_puzzle_state(), status, share + time_spent))
+	return results
+
+
+def _chunks(puzzles, chunksize):
+	'''
+	output:
+	------
+		* yields 2-uples (index of the chunk's first puzzle, list of puzzles), reading
+			'puzzles' lazily;
+	'''
+	chunk = []
+	first = 0
+	for puzzle in puzzles:
+		chunk.append(puzzle)
+		if len(chunk) == chunksize:
+			yield first, chunk
+			first += chunksize
+			chunk = []
+	if chunk:
+		yield first, chunk
+
+
+def solve_many(puzzles, workers=None, chunksize=16, engine=None, ordered=True, presolve=False):
+	'''
+	input:
+	-----
+		* puzzles: an iterable of sudoku states as 2D NumPy arrays (for instance, a
+			(batch, n, n) NumPy array), which is read lazily;
+		* workers: the number of worker processes, defaults to the number of CPUs;
+		* chunksize: how many puzzles are sent at once to a worker;
+		* engine: the engine used by 'Sudoku.solve', defaults to None (the default
+			engine of each n, see 'nsudoku.default_engine');
+		* ordered: if True, results are yielded in the same order as 'puzzles',
+			otherwise they're yielded as soon as they're ready;
+		* presolve: if True, each chunk is propagated at once by
+			'propagation.propagate_many' and only the puzzles left stuck by it are
+			given to the engine (e. g., to 'lp', which is much slower than propagation),
+			the puzzles it proves infeasible being reported as such, partially filled;
+			the puzzles of a chunk must then share the same n;
+	output:
+	------
+		* yields a 4-uple (index of the puzzle in 'puzzles', solved sudoku state, status,
+			time spent in milliseconds) for each puzzle;
+		the CPUs are split among the workers, so the solver threads of all of the
+		concurrent solves never outnumber the available CPUs; at most two chunks per
+		worker are kept in flight, so the memory used doesn't depend on the number
+		of puzzles;
+	'''
+	cpus = os.cpu_count() or 1
+	if workers is None or workers <= 0:
+		workers = cpus
+	if chunksize <= 0:
+		raise Exception('The chunksize must be a positive integer:', chunksize)
+	num_threads = max(1, cpus // workers)
+
+	with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(num_threads,)) as executor:
+		pending = deque()
+		for first, chunk in _chunks(puzzles, chunksize):
+			pending.append(executor.submit(_solve_chunk, first, chunk, engine, presolve))
+			if len(pending) >= 2 * workers:
+				for result in _drain(pending, ordered):
+					yield result
+		while pending:
+			for result in _drain(pending, ordered):
+				yield result
+
+
+def _drain(pending, ordered):
+	'''
+	output:
+	------
+		* waits for (and removes from 'pending') the oldest submitted chunk if 'ordered'
+			is True, or for any completed chunk otherwise, yielding its results;
+	'''
+	if ordered:
+		done = [pending.popleft()]
+	else:
+		done, _ = wait(pending, return_when=FIRST_COMPLETED)
+		for future in done:
+			pending.remove(future)
+	for future in done:
+		for result in future.result():
+			yield result
@@ -0,0 +1,238 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Reproducible benchmark of the n-sudoku engines over fixed, seeded,
+	corpora of puzzles of several sizes and clue densities, timing each
+	phase of the solve separately and writing the results as JSON, so two
+	runs (e. g., before and after a change) may be diffed. Each (size,
+	density, engine) triple runs in its own process, whose peak resident
+	memory (including the memory allocated by OR-Tools) is reported.
+
+	usage: python benchmark.py [--sizes 9 16 25] [--densities 0.2 0.35 0.5]
+		[--engines bitmask cpsat bop cbc] [--puzzles 5] [--seed 0]
+		[--time-limit 10000] [--trace-memory] [--output results.json]
+	---------------------------------------------------------------
+'''
+from nsudoku import Sudoku
+from linear_programming_solver import create_solver, STATUS_OPTIMAL, STATUS_FEASIBLE, STATUS_NOT_SOLVED, VAR_TYPE_BINARY
+from generator import full_grid
+from instrumentation import SolveStats
+from portfolio import process_context
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import argparse
+import json
+import ortools
+import platform
+import sys
+import time
+import tracemalloc
+try:
+	import resource
+except ImportError:  # not available on windows
+	resource = None
+
+
+def corpus(n, density, puzzles, seed):
+	'''
+	output:
+	------
+		* returns a (puzzles, n, n) NumPy array of puzzles, each one keeping (roughly) a
+			'density' fraction of the cells of a random full grid as clues; the same
+			arguments always yield the same puzzles;
+	'''
+	rng = np.random.default_rng([seed, n, int(round(density * 1000))])
+	grids = np.stack([full_grid(n, rng) for _ in range(puzzles)]).astype(int)
+	return np.where(rng.random(grids.shape) < density, grids, 0)
+
+
+def run_lp(puzzle, method, time_limit):
+	'''
+	output:
+	------
+		* solves the puzzle with the linear programming model and the given method,
+			returning its phases timings (in milliseconds), status, validity, number of
+			iterations, of branch and bound nodes and of conflicts (None whenever not
+			available);
+	'''
+	phases = {}
+	sudoku = Sudoku(puzzle.copy(), n=puzzle.shape[0])
+
+	start = time.perf_counter()
+	tableau = sudoku.linear_programming_model(sparse=True)
+	phases['model'] = _elapsed(start)
+
+	start = time.perf_counter()
+	vars_properties = {}
+	if method == 'CBC':
+		vars_properties = {k: (VAR_TYPE_BINARY, 0, 1) for k in range(tableau['num_vars'])}
+	solver, X = create_solver(tableau['obj_coeffs'], tableau['constraint_coeffs'], tableau['lower_bounds'], tableau['upper_bounds'], vars_properties, False, method, 1)
+	phases['build'] = _elapsed(start)
+
+	start = time.perf_counter()
+	if time_limit is not None:
+		solver.SetTimeLimit(time_limit)
+	status = solver.Solve()
+	phases['solve'] = _elapsed(start)
+
+	start = time.perf_counter()
+	sudoku.lp_solution = np.array([variable.solution_value() for variable in X])
+	sudoku._lpsolution2sudoku()
+	phases['decode'] = _elapsed(start)
+
+	iterations, nodes = None, None
+	if method == 'CBC':
+		iterations, nodes = solver.iterations(), solver.nodes()
+	return phases, status, sudoku.is_valid(), iterations, nodes, None
+
+
+def run_engine(puzzle, engine, time_limit):
+	'''
+	output:
+	------
+		* solves the puzzle with 'Sudoku.solve', returning the same outputs as 'run_lp';
+			every engine honors 'time_limit', so no run outlasts it (by much);
+	'''
+	stats = SolveStats()
+	sudoku = Sudoku(puzzle.copy(), n=puzzle.shape[0], stats=stats)
+	start = time.perf_counter()
+	_, _, status, _ = sudoku.solve(engine, num_threads=1, time_limit=time_limit)
+	phases = {'solve': _elapsed(start)}
+	return phases, status, sudoku.is_valid(), stats.values.get('iterations'), stats.values.get('nodes'), stats.values.get('conflicts')
+
+
+def benchmark(sizes, densities, engines, puzzles, seed, time_limit, trace_memory):
+	'''
+	output:
+	------
+		* returns a list with the summary (a dict) of every (size, density, engine) run,
+			each one run by a process of its own (see 'run_triple');
+	'''
+	results = []
+	for n in sizes:
+		for density in densities:
+			for engine in engines:
+				# a new process for each triple, since the peak memory of a process never goes down
+				with ProcessPoolExecutor(max_workers=1, mp_context=process_context()) as executor:
+					results.append(executor.submit(run_triple, n, density, engine, puzzles, seed, time_limit, trace_memory).result())
+	return results
+
+
+def run_triple(n, density, engine, puzzles, seed, time_limit, trace_memory):
+	'''
+	output:
+	------
+		* solves the corpus of a (size, density, engine) triple, returning its summary,
+			which holds the peak resident memory of the calling process, in bytes
+			(None whenever not available), meant to be a process of its own (whose
+			baseline, the interpreter and the preloaded solvers, is the same for every
+			triple);
+	'''
+	grids = corpus(n, density, puzzles, seed)
+	if trace_memory:
+		tracemalloc.start()
+	runs = []
+	for puzzle in grids:
+		if engine.upper() in ('BOP', 'CBC'):
+			runs.append(run_lp(puzzle, engine.upper(), time_limit))
+		else:
+			runs.append(run_engine(puzzle, engine, time_limit))
+	peak = None
+	if trace_memory:
+		peak = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+	summary = _summary(n, density, engine, runs, peak)
+	summary['peak_rss_bytes'] = _peak_rss()
+	return summary
+
+
+def _summary(n, density, engine, runs, peak):
+	'''
+	output:
+	------
+		* returns a dict summarizing the runs of a single (size, density, engine) triple;
+	'''
+	phases = {}
+	for name in runs[0][0]:
+		timings = np.array([run[0][name] for run in runs])
+		phases[name] = {
+			'mean_ms': round(float(timings.mean()), 3),
+			'median_ms': round(float(np.median(timings)), 3),
+			'p95_ms': round(float(np.percentile(timings, 95)), 3),
+			'max_ms': round(float(timings.max()), 3),
+		}
+	iterations = [run[3] for run in runs if run[3] is not None]
+	nodes = [run[4] for run in runs if run[4] is not None]
+	conflicts = [run[5] for run in runs if run[5] is not None]
+	return {
+		'n': n,
+		'density': density,
+		'engine': engine,
+		'puzzles': len(runs),
+		'solved': sum(1 for run in runs if run[1] in (STATUS_OPTIMAL, STATUS_FEASIBLE)),
+		'timeouts': sum(1 for run in runs if run[1] == STATUS_NOT_SOLVED),
+		'valid': sum(1 for run in runs if run[2]),
+		'phases': phases,
+		'mean_iterations': round(float(np.mean(iterations)), 1) if iterations else None,
+		'mean_nodes': round(float(np.mean(nodes)), 1) if nodes else None,
+		'mean_conflicts': round(float(np.mean(conflicts)), 1) if conflicts else None,
+		'peak_traced_memory_bytes': peak,
+	}
+
+
+def _peak_rss():
+	'''
+	output:
+	------
+		* returns the peak resident memory of this process, in bytes, or None whenever
+			it's not available;
+	'''
+	if resource is None:
+		return None
+	# ru_maxrss is given in kilobytes on linux and in bytes on macOS
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _elapsed(start):
+	'''
+	output:
+	------
+		* returns the milliseconds elapsed since 'start' (a 'time.perf_counter' value);
+	'''
+	return (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Benchmarks the n-sudoku engines.')
+	parser.add_argument('--sizes', type=int, nargs='+', default=[9, 16, 25])
+	parser.add_argument('--densities', type=float, nargs='+', default=[0.2, 0.35, 0.5])
+	parser.add_argument('--engines', nargs='+', default=['bitmask', 'cpsat', 'bop', 'cbc'])
+	parser.add_argument('--puzzles', type=int, default=5, help='number of puzzles per size and density')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--time-limit', type=int, default=10000, help='time limit of each run, in milliseconds')
+	parser.add_argument('--trace-memory', action='store_true', help='records the peak memory traced by tracemalloc (slows the runs down)')
+	parser.add_argument('--output', default=None, help='the JSON file to write, defaults to the standard output')
+	args = parser.parse_args(argv)
+
+	report = {
+		'settings': vars(args),
+		'environment': {
+			'python': platform.python_version(),
+			'numpy': np.__version__,
+			'ortools': ortools.__version__,
+			'platform': platform.platform(),
+		},
+		'results': benchmark(args.sizes, args.densities, args.engines, args.puzzles, args.seed, args.time_limit, args.trace_memory),
+	}
+	text = json.dumps(report, indent=2, sort_keys=True)
+	if args.output is None:
+		print(text)
+	else:
+		with open(args.output, 'w') as output:
+			output.write(text + '\n')
+
+
+if __name__ == '__main__':
+	main(sys.argv[1:])
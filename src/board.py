@@ -0,0 +1,229 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	A compact representation of n-sudoku states, meant for keeping many
+	of them in memory: grids are stored as uint8 arrays (for n <= 255) and
+	the candidates of each cell as a bitmask (bit k stands for the digit
+	k + 1) within a single unsigned integer array (for n <= 64), using the
+	smallest unsigned type holding n bits. Boards may be zero-copy views
+	into the buffers of a 'BoardBatch'.
+	---------------------------------------------------------------
+'''
+from propagation import candidates as grid_candidates, candidates_many
+from sudoku_structure import box_shape
+import numpy as np
+
+
+def grid_dtype(n):
+	'''
+	output:
+	------
+		* returns the smallest unsigned integer NumPy type holding the digits of an
+			n-sudoku;
+	'''
+	return np.uint8 if n <= 255 else np.uint16
+
+
+def mask_dtype(n):
+	'''
+	output:
+	------
+		* returns the smallest unsigned integer NumPy type holding the candidates of a
+			cell of an n-sudoku as a bitmask;
+	Exceptions:
+	----------
+		Raises an exception of type "Exception" if n is greater than 64.
+	'''
+	for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+		if n <= np.iinfo(dtype).bits:
+			return dtype
+	raise Exception('Candidates bitmasks only support n <= 64, found n=' + str(n) + '.')
+
+
+def pack_candidates(candidates):
+	'''
+	output:
+	------
+		* returns the bitmasks of a (..., n) boolean NumPy array of candidates, as an
+			array of shape (...) of type 'mask_dtype(n)';
+	'''
+	n = candidates.shape[-1]
+	dtype = mask_dtype(n)
+	bits = np.left_shift(np.ones(shape=n, dtype=dtype), np.arange(n, dtype=dtype))
+	return np.bitwise_or.reduce(np.where(candidates, bits, dtype(0)), axis=-1)
+
+
+def unpack_candidates(masks, n):
+	'''
+	output:
+	------
+		* returns the (..., n) boolean NumPy array of candidates of the given bitmasks
+			(the inverse of 'pack_candidates');
+	'''
+	masks = np.asarray(masks)
+	shifts = np.arange(n, dtype=masks.dtype)
+	return (np.right_shift(masks[..., None], shifts) & masks.dtype.type(1)).astype(bool)
+
+
+class Board:
+	"""
+	A single n-sudoku state, holding its cells as a 2D uint8 array and the candidates
+	of its cells as a 2D array of bitmasks, either of which may be a view into a
+	larger buffer (see 'BoardBatch').
+	"""
+	__slots__ = ('cells', 'masks', 'box')
+
+	def __init__(self, cells, masks=None, box=None):
+		'''
+		input:
+		-----
+			* cells: the sudoku state as a 2D NumPy array (see 'grid_dtype'), where 0
+				marks an empty cell, which is kept as is (not copied);
+			* masks: the candidates bitmasks of its cells as a 2D NumPy array (see
+				'mask_dtype'), kept as is, defaults to None, where they're computed;
+			* box: the (rows, columns) dimensions of a box, defaults to
+				'sudoku_structure.box_shape(n)';
+		'''
+		self.cells = cells
+		self.box = box_shape(cells.shape[0], box)
+		if masks is None:
+			masks = pack_candidates(grid_candidates(cells, self.box))
+		self.masks = masks
+
+	@classmethod
+	def from_array(cls, grid, box=None):
+		'''
+		output:
+		------
+			* returns a new board holding a copy of the sudoku state 'grid' (a 2D NumPy
+				array, such as the one returned by 'Sudoku.get_puzzle_state'), whose
+				boxes are 'box' (see 'Board');
+		'''
+		grid = np.asarray(grid)
+		return cls(grid.astype(grid_dtype(grid.shape[0])), box=box)
+
+	@property
+	def n(self):
+		return self.cells.shape[0]
+
+	@property
+	def nbytes(self):
+		'''
+		output:
+		------
+			* returns the number of bytes held by the cells and the candidates of this board;
+		'''
+		return self.cells.nbytes + self.masks.nbytes
+
+	def to_array(self):
+		'''
+		output:
+		------
+			* returns a copy of the sudoku state as a 2D int NumPy array, just like the
+				ones held by 'nsudoku.Sudoku';
+		'''
+		return self.cells.astype(int)
+
+	def candidates(self):
+		'''
+		output:
+		------
+			* returns the candidates of the cells as a (n, n, n) boolean NumPy array,
+				just like 'propagation.candidates';
+		'''
+		return unpack_candidates(self.masks, self.n)
+
+	def place(self, i, j, v, box=None):
+		'''
+		output:
+		------
+			* fills the cell (i, j) with the digit v and removes v from the candidates
+				of the other cells of its row, column and box, where 'box' defaults to
+				the boxes of this board;
+		'''
+		box_rows, box_cols = self.box if box is None else box_shape(self.n, box)
+		bit = self.masks.dtype.type(1 << (v - 1))
+		self.cells[i, j] = v
+		self.masks[i, :] &= ~bit
+		self.masks[:, j] &= ~bit
+		i0, j0 = i - i % box_rows, j - j % box_cols
+		self.masks[i0:i0 + box_rows, j0:j0 + box_cols] &= ~bit
+		self.masks[i, j] = bit
+
+	def refresh(self, box=None):
+		'''
+		output:
+		------
+			* recomputes, in place, the candidates of the cells out of their digits,
+				where 'box' defaults to the boxes of this board;
+		'''
+		self.masks[...] = pack_candidates(grid_candidates(self.cells, self.box if box is None else box))
+
+
+class BoardBatch:
+	"""
+	Many n-sudoku states held by two contiguous buffers, a (count, n, n) uint8 one for
+	their cells and a (count, n, n) one for the candidates bitmasks, whose items are
+	boards viewing (rather than copying) their slice of the buffers.
+	"""
+	__slots__ = ('cells', 'masks', 'box')
+
+	def __init__(self, cells, masks=None, box=None):
+		'''
+		input:
+		-----
+			* cells: a (count, n, n) NumPy array of sudoku states (see 'grid_dtype');
+			* masks: the (count, n, n) candidates bitmasks of their cells, defaults to
+				None, where they're computed;
+			* box: the (rows, columns) dimensions of a box, shared by every state,
+				defaults to 'sudoku_structure.box_shape(n)';
+		'''
+		self.cells = cells
+		self.box = box_shape(cells.shape[1], box)
+		if masks is None:
+			masks = pack_candidates(candidates_many(cells, self.box))
+		self.masks = masks
+
+	@classmethod
+	def from_arrays(cls, grids, box=None):
+		'''
+		output:
+		------
+			* returns a new batch holding a copy of the given sudoku states (a
+				(count, n, n) NumPy array or any sequence of 2D ones), whose boxes are
+				'box' (see 'BoardBatch');
+		'''
+		grids = np.asarray(grids)
+		return cls(grids.astype(grid_dtype(grids.shape[1])), box=box)
+
+	def to_arrays(self):
+		'''
+		output:
+		------
+			* returns a copy of the sudoku states as a (count, n, n) int NumPy array;
+		'''
+		return self.cells.astype(int)
+
+	@property
+	def nbytes(self):
+		return self.cells.nbytes + self.masks.nbytes
+
+	def __len__(self):
+		return self.cells.shape[0]
+
+	def __getitem__(self, index):
+		'''
+		output:
+		------
+			* returns a board viewing the index-th state, or a batch viewing the states
+				of a slice of this batch;
+		'''
+		if isinstance(index, slice):
+			return BoardBatch(self.cells[index], self.masks[index], self.box)
+		return Board(self.cells[index], self.masks[index], self.box)
+
+	def __iter__(self):
+		for index in range(0, len(self)):
+			yield self[index]
+
@@ -0,0 +1,167 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Canonical forms of n-sudoku states under the transformations which
+	preserve their solutions: relabeling the digits, moving rows within
+	a band, moving bands, moving columns within a stack, moving stacks
+	and (for square boxes) transposing the grid.
+
+	A transform is kept as a 4-uple (transpose, rows, cols, digits), which
+	maps a grid g into digits[h[rows][:, cols]], where h is g.T if transpose
+	is True or g otherwise.
+	---------------------------------------------------------------
+'''
+from sudoku_structure import box_shape
+from itertools import permutations, product
+from math import factorial
+import numpy as np
+
+
+def canonical_form(grid, box=None, limit=1024):
+	'''
+	input:
+	-----
+		* grid: the sudoku state as a 2D NumPy array, where 0 marks an empty cell;
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+		* limit: the maximum number of row and column arrangements compared;
+	output:
+	------
+		* the canonical form of 'grid' as a 2D uint8 NumPy array;
+		* the transform mapping 'grid' into its canonical form;
+		rows and columns are first sorted by invariants of the transformations (the
+		number of clues in each line and in each of its boxes), then every arrangement of
+		the lines tied by those invariants is tried, after relabeling the digits by order
+		of appearance, keeping the lexicographically smallest one. Whenever there are more
+		than 'limit' arrangements to try, the ties are kept in their original order, so
+		isomorphic states may not share a canonical form, although states sharing a
+		canonical form are always isomorphic;
+	'''
+	n = grid.shape[0]
+	box = box_shape(n, box)
+	box_rows, box_cols = box
+	grid = np.asarray(grid)
+
+	options = [(False, grid, box_rows, box_cols)]
+	if box_rows == box_cols:
+		options.append((True, grid.T, box_rows, box_cols))
+
+	transforms = []
+	keys = []
+	for transpose, h, line_group, column_group in options:
+		rows = _arrangements(h, line_group, column_group, limit)
+		cols = _arrangements(h.T, column_group, line_group, max(1, limit // len(rows)))
+		rows, cols = np.array(rows), np.array(cols)
+		arranged = h[rows[:, None, :, None], cols[None, :, None, :]].reshape(-1, n * n)
+		digits = _relabel(arranged, n)
+		keys.append(np.take_along_axis(digits, arranged, axis=1))
+		transforms.extend((transpose, r, c, d) for (r, c), d in zip(product(rows, cols), digits))
+
+	keys = np.concatenate(keys)
+	best = np.lexsort(keys.T[::-1])[0]
+	return keys[best].reshape(n, n).astype(np.uint8), transforms[best]
+
+
+def apply_transform(grid, transform):
+	'''
+	output:
+	------
+		* returns 'grid' mapped by 'transform';
+	'''
+	transpose, rows, cols, digits = transform
+	h = grid.T if transpose else grid
+	return digits[h[rows][:, cols]]
+
+
+def invert_transform(grid, transform):
+	'''
+	output:
+	------
+		* returns the grid which 'transform' maps into 'grid', e. g., the solution of the
+			original state out of the solution of its canonical form;
+	'''
+	transpose, rows, cols, digits = transform
+	inverse_digits = np.empty_like(digits)
+	inverse_digits[digits] = np.arange(digits.shape[0])
+	h = inverse_digits[grid][np.argsort(rows)][:, np.argsort(cols)]
+	return h.T if transpose else h
+
+
+def _arrangements(h, line_group, column_group, limit):
+	'''
+	output:
+	------
+		* returns a list of line (row) orders of 'h', given as arrays, where lines are
+			grouped in bands of 'line_group' lines and columns in stacks of
+			'column_group' columns: bands and the lines within each band are sorted by
+			their invariants and every arrangement of the ties is listed, unless there
+			are more than 'limit' of them, where only the sorted order is listed;
+	'''
+	n = h.shape[0]
+	filled = (h != 0).reshape(n, n // column_group, column_group).sum(axis=2)
+	line_keys = [(int(counts.sum()),) + tuple(sorted(counts.tolist())) for counts in filled]
+
+	bands = []
+	for band in range(0, n // line_group):
+		lines = sorted(range(band * line_group, (band + 1) * line_group), key=lambda line: line_keys[line])
+		bands.append((tuple(sorted(line_keys[line] for line in lines)), lines))
+	bands.sort(key=lambda item: item[0])
+
+	# every group of tied bands and of tied lines within a band may be arranged freely
+	band_groups = _ties([key for key, _ in bands], list(range(len(bands))))
+	line_groups = []
+	for _, lines in bands:
+		line_groups += _ties([line_keys[line] for line in lines], lines)
+	total = 1
+	for group in band_groups + line_groups:
+		total *= factorial(len(group))
+	if total > limit:
+		return [np.array([line for _, lines in bands for line in lines])]
+
+	result = []
+	for band_choice in product(*[list(permutations(group)) for group in band_groups]):
+		band_order = {}
+		for group, arranged in zip(band_groups, band_choice):
+			band_order.update(zip(group, arranged))
+		arranged_bands = [bands[band_order.get(b, b)][1] for b in range(len(bands))]
+		for line_choice in product(*[list(permutations(group)) for group in line_groups]):
+			line_order = {}
+			for group, arranged in zip(line_groups, line_choice):
+				line_order.update(zip(group, arranged))
+			result.append(np.array([line_order.get(line, line) for lines in arranged_bands for line in lines]))
+	return result
+
+
+def _ties(keys, items):
+	'''
+	output:
+	------
+		* returns the groups (as tuples) of consecutive 'items' sharing the same key,
+			whenever a group has more than one item;
+	'''
+	groups = []
+	start = 0
+	for k in range(1, len(items) + 1):
+		if k == len(items) or keys[k] != keys[start]:
+			if k - start > 1:
+				groups.append(tuple(items[start:k]))
+			start = k
+	return groups
+
+
+def _relabel(arranged, n):
+	'''
+	output:
+	------
+		* returns a (count, n + 1) NumPy array, where each line relabels the digits of the
+			matching grid in 'arranged' by their order of appearance (the digits absent
+			from the grid come last, in increasing order), 0 being kept as 0;
+	'''
+	count, cells = arranged.shape
+	first = np.empty(shape=(count, n), dtype=int)
+	for k in range(0, n):
+		found = arranged == k + 1
+		first[:, k] = np.where(found.any(axis=1), found.argmax(axis=1), cells + k)
+	digits = np.zeros(shape=(count, n + 1), dtype=arranged.dtype)
+	np.put_along_axis(digits, np.argsort(first, axis=1) + 1, np.arange(1, n + 1), axis=1)
+	return digits
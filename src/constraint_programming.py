@@ -0,0 +1,99 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Solves an n-sudoku with the Google OR-Tools CP-SAT solver, stating its
+	constraints natively (one "exactly one" constraint per cell and per
+	digit of each unit) rather than as rows of a dense matrix, and creating
+	variables only for the (cell, digit) candidates still possible.
+	---------------------------------------------------------------
+'''
+from linear_programming_solver import CPSAT_STATUS, STATUS_INFEASIBLE, record_cpsat
+from instrumentation import NULL_STATS
+from sudoku_structure import units
+from propagation import candidates as grid_candidates
+from ortools.sat.python import cp_model
+import numpy as np
+import os
+
+
+def solve_cp(grid, box=None, candidates=None, time_limit=None, num_workers=8, stats=NULL_STATS):
+	'''
+	input:
+	-----
+		* grid: the sudoku state as a 2D NumPy array, where 0 marks an empty cell;
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+		* candidates: the (n, n, n) boolean NumPy array of the digits each cell may
+			hold (see 'propagation.candidates', which is used by default), e. g., the
+			candidates left by 'propagation.propagate';
+		* time_limit: the maximum wall-clock time, in milliseconds, given to the solver,
+			defaults to None (no limit);
+		* num_workers: the number of parallel search workers, capped at the number of
+			CPUs (since extra workers only take CPU time away from the others);
+		* stats: an 'instrumentation.SolveStats' which records the time spent building
+			the model ('build') and searching for its solution ('search'), the number of
+			variables and constraints, the status and the number of branches and conflicts;
+	output:
+	------
+		* the solution as a 2D NumPy array, or None if none was found;
+		* the status of the search, given by the constants of 'linear_programming_solver';
+		* the time spent to find the solution, measured in milliseconds;
+	'''
+	with stats.phase('build'):
+		n = grid.shape[0]
+		if candidates is None:
+			candidates = grid_candidates(grid, box)
+		candidates = candidates.reshape(n * n, n)
+		if not candidates.any(axis=1).all():
+			stats.record('status', STATUS_INFEASIBLE)
+			return None, STATUS_INFEASIBLE, 0
+
+		model = cp_model.CpModel()
+		cells, digits = np.nonzero(candidates)
+		literals = [model.NewBoolVar('x[%i]' % (cell * n + k)) for cell, k in zip(cells.tolist(), digits.tolist())]
+		index = np.full(shape=(n * n, n), fill_value=-1)
+		index[cells, digits] = np.arange(len(literals))
+
+		# a single digit per cell
+		for row in index.tolist():
+			_exactly_one(model, [literals[v] for v in row if v >= 0])
+		# each digit exactly once per row, column and box
+		for unit in units(n, box):
+			for column in index[unit].T.tolist():
+				spots = [literals[v] for v in column if v >= 0]
+				if not spots:
+					stats.record('status', STATUS_INFEASIBLE)
+					return None, STATUS_INFEASIBLE, 0
+				_exactly_one(model, spots)
+	if stats.enabled:
+		stats.record('num_vars', len(literals))
+		stats.record('num_constraints', len(model.Proto().constraints))
+
+	solver = cp_model.CpSolver()
+	solver.parameters.num_search_workers = max(1, min(int(num_workers), os.cpu_count() or 1))
+	if time_limit is not None:
+		solver.parameters.max_time_in_seconds = time_limit / 1000
+	with stats.phase('search'):
+		status = solver.Solve(model)
+	record_cpsat(stats, solver, status)
+	time_spent = int(round(solver.WallTime() * 1000))
+
+	if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+		return None, CPSAT_STATUS[status], time_spent
+	chosen = np.array([solver.BooleanValue(literal) for literal in literals])
+	solution = np.zeros(shape=n * n, dtype=grid.dtype)
+	solution[cells[chosen]] = digits[chosen] + 1
+	return solution.reshape(n, n), CPSAT_STATUS[status], time_spent
+
+
+def _exactly_one(model, literals):
+	'''
+	output:
+	------
+		* adds to 'model' the constraint forcing exactly one of 'literals' to be true,
+			natively whenever the OR-Tools version supports it;
+	'''
+	if hasattr(model, 'AddExactlyOne'):
+		model.AddExactlyOne(literals)
+	else:
+		model.Add(sum(literals) == 1)
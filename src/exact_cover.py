@@ -0,0 +1,159 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	A native exact cover search for the n-sudoku, covering the very same
+	row, column, cell and box constraints of the linear programming model,
+	where the digits still available to each row, column and box are kept
+	as integer bitmasks (bit k stands for the digit k + 1).
+	---------------------------------------------------------------
+'''
+from sudoku_structure import box_shape, units
+import numpy as np
+import time
+
+
+# how many nodes are searched between two checks of the time limit
+CLOCK_INTERVAL = 256
+
+
+class TimeLimitReached(Exception):
+	"""
+	Raised by 'search' when its time limit is reached before the search ends.
+	"""
+
+
+def search(grid, box=None, limit=None, rng=None, time_limit=None):
+	'''
+	Depth-first search always branching on the empty cell with the fewest candidates.
+	input:
+	-----
+		* grid: the sudoku state as a 2D NumPy array, where 0 marks an empty cell;
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+		* limit: stops after this many solutions, defaults to None (no limit);
+		* rng: a 'numpy.random.Generator' used to shuffle the order in which digits
+			are tried, defaults to None (digits are tried in increasing order);
+		* time_limit: the maximum wall-clock time, in milliseconds, given to the search,
+			defaults to None (no limit);
+	output:
+	------
+		* yields each solution found as a 2D NumPy array;
+	Exceptions:
+	----------
+		Raises an exception of type "TimeLimitReached" if the time limit is reached
+		before the search ends (the solutions found until then were yielded already).
+	'''
+	deadline = None if time_limit is None else time.perf_counter() + time_limit / 1000
+	n = grid.shape[0]
+	box = box_shape(n, box)
+	box_rows, box_cols = box
+	full = (1 << n) - 1
+
+	values = [int(value) for value in grid.ravel()]
+	cell_row = [cell // n for cell in range(n * n)]
+	cell_col = [cell % n for cell in range(n * n)]
+	cell_box = [(cell // n) // box_rows * (n // box_cols) + (cell % n) // box_cols for cell in range(n * n)]
+	rows = [0] * n
+	cols = [0] * n
+	boxes = [0] * n
+
+	for cell, value in enumerate(values):
+		if value != 0:
+			bit = 1 << (value - 1)
+			if (rows[cell_row[cell]] | cols[cell_col[cell]] | boxes[cell_box[cell]]) & bit:
+				return
+			rows[cell_row[cell]] |= bit
+			cols[cell_col[cell]] |= bit
+			boxes[cell_box[cell]] |= bit
+	empties = [cell for cell, value in enumerate(values) if value == 0]
+	masks = [0] * (n * n)
+	unit_cells = units(n, box).tolist()
+	unit_used = (rows, cols, boxes)
+
+	found = 0
+	nodes = 0
+	stack = []  # each frame holds a cell and the digits (as a bitmask) not yet tried on it
+	while True:
+		nodes += 1
+		if deadline is not None and nodes % CLOCK_INTERVAL == 0 and time.perf_counter() > deadline:
+			raise TimeLimitReached('The time limit of the search was reached.')
+
+		# selects the most constrained empty cell
+		best, best_mask, best_count = -1, 0, n + 1
+		for cell in empties:
+			if values[cell] == 0:
+				mask = full & ~(rows[cell_row[cell]] | cols[cell_col[cell]] | boxes[cell_box[cell]])
+				masks[cell] = mask
+				count = bin(mask).count('1')
+				if count < best_count:
+					best, best_mask, best_count = cell, mask, count
+					if count <= 1:
+						break
+
+		# looks for hidden singles (digits fitting a single cell of an unit) and for
+		# digits fitting no cell at all, which are dead ends
+		if best_count > 1:
+			for u, cells in enumerate(unit_cells):
+				once = twice = 0
+				for cell in cells:
+					if values[cell] == 0:
+						twice |= once & masks[cell]
+						once |= masks[cell]
+				if full & ~(unit_used[u // n][u % n] | once):
+					best_count = 0
+					break
+				hidden = once & ~twice
+				if hidden:
+					best_mask = hidden & -hidden
+					best = next(cell for cell in cells if values[cell] == 0 and masks[cell] & best_mask)
+					best_count = 1
+					break
+
+		if best == -1:
+			yield np.array(values, dtype=grid.dtype).reshape(n, n)
+			found += 1
+			if limit is not None and found >= limit:
+				return
+		elif best_count > 0:
+			stack.append([best, best_mask])
+
+		# tries the next digit on the deepest cell, backtracking when it runs out of digits
+		while stack:
+			frame = stack[-1]
+			cell = frame[0]
+			if values[cell] != 0:
+				bit = ~(1 << (values[cell] - 1))
+				rows[cell_row[cell]] &= bit
+				cols[cell_col[cell]] &= bit
+				boxes[cell_box[cell]] &= bit
+				values[cell] = 0
+			if frame[1] == 0:
+				stack.pop()
+				continue
+			if rng is None:
+				bit = frame[1] & -frame[1]
+			else:
+				bits = [1 << k for k in range(n) if frame[1] >> k & 1]
+				bit = bits[rng.integers(len(bits))]
+			frame[1] ^= bit
+			values[cell] = bit.bit_length()
+			rows[cell_row[cell]] |= bit
+			cols[cell_col[cell]] |= bit
+			boxes[cell_box[cell]] |= bit
+			break
+		else:
+			return
+
+
+def count_solutions(grid, box=None, limit=2):
+	'''
+	output:
+	------
+		* returns the number of solutions of the given sudoku state, stopping the
+			search as soon as 'limit' solutions are found (so the result never exceeds
+			'limit', and 'limit=2' is enough to tell whether the solution is unique);
+	'''
+	count = 0
+	for _ in search(grid, box, limit=limit):
+		count += 1
+	return count
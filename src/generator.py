@@ -0,0 +1,142 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Generates n-sudoku puzzles with a unique solution: a full grid is drawn
+	by shuffling a valid base grid, then its clues are removed, one at a
+	time and in random order, for as long as the solution stays unique.
+	---------------------------------------------------------------
+'''
+from sudoku_structure import box_shape
+from exact_cover import count_solutions
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+def full_grid(n=9, rng=None, box=None):
+	'''
+	input:
+	-----
+		* n: the size of the sudoku;
+		* rng: a 'numpy.random.Generator' (or a seed for one);
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+	output:
+	------
+		* returns a random, completely filled, valid n-sudoku as a 2D uint8 NumPy
+			array, built by relabeling the digits and shuffling the rows within each
+			band, the bands, the columns within each stack and the stacks of a base
+			grid (which is also transposed half of the time);
+	'''
+	rng = np.random.default_rng(rng)
+	box = box_shape(n, box)
+	box_rows, box_cols = box
+
+	i, j = np.indices((n, n))
+	grid = (box_cols * (i % box_rows) + i // box_rows + j) % n + 1
+
+	bands = rng.permutation(n // box_rows)[:, None] * box_rows
+	rows = (bands + np.argsort(rng.random((n // box_rows, box_rows)), axis=1)).ravel()
+	stacks = rng.permutation(n // box_cols)[:, None] * box_cols
+	cols = (stacks + np.argsort(rng.random((n // box_cols, box_cols)), axis=1)).ravel()
+	digits = np.concatenate([[0], rng.permutation(n) + 1])
+
+	grid = digits[grid[rows][:, cols]]
+	if box_rows == box_cols and rng.integers(2):
+		grid = grid.T
+	return grid.astype(np.uint8)
+
+
+def remove_clues(solution, clues=0, rng=None, box=None):
+	'''
+	input:
+	-----
+		* solution: a completely filled n-sudoku as a 2D NumPy array;
+		* clues: the target number of clues, defaults to 0, i. e., as few as possible;
+		* rng: a 'numpy.random.Generator' (or a seed for one);
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+	output:
+	------
+		* returns a copy of 'solution' where its cells were emptied (set to 0), in a
+			random order, as long as the puzzle kept 'solution' as its only solution
+			and until only 'clues' clues were left; the puzzle may end up with more
+			clues than the target whenever no other cell may be emptied;
+	'''
+	rng = np.random.default_rng(rng)
+	n = solution.shape[0]
+	box = box_shape(n, box)
+	box_rows, box_cols = box
+	puzzle = solution.copy()
+	filled = n * n
+	for cell in rng.permutation(n * n):
+		if filled <= clues:
+			break
+		i, j = divmod(cell, n)
+		value = puzzle[i, j]
+		puzzle[i, j] = 0
+
+		# as the puzzle had a unique solution before, any other solution must place
+		# another digit on this cell, so it's enough to look for a single solution
+		# for each of the other digits which fit it
+		top, left = i - i % box_rows, j - j % box_cols
+		used = np.concatenate([puzzle[i], puzzle[:, j], puzzle[top:top + box_rows, left:left + box_cols].ravel()])
+		unique = True
+		for digit in np.setdiff1d(np.arange(1, n + 1), used):
+			if digit != value:
+				puzzle[i, j] = digit
+				if count_solutions(puzzle, box, limit=1) > 0:
+					unique = False
+					break
+
+		if unique:
+			puzzle[i, j] = 0
+			filled -= 1
+		else:
+			puzzle[i, j] = value
+	return puzzle
+
+
+def generate(n=9, clues=0, rng=None, box=None):
+	'''
+	output:
+	------
+		* returns a random n-sudoku puzzle with a unique solution and (as close as
+			possible to) 'clues' clues, as a 2D uint8 NumPy array; see 'full_grid' and
+			'remove_clues' for the description of the inputs;
+	'''
+	rng = np.random.default_rng(rng)
+	return remove_clues(full_grid(n, rng, box), clues, rng, box)
+
+
+def _generate_chunk(count, n, clues, seed, box):
+	'''
+	output:
+	------
+		* returns a (count, n, n) uint8 NumPy array of puzzles drawn by 'generate';
+	'''
+	rng = np.random.default_rng(seed)
+	return np.array([generate(n, clues, rng, box) for _ in range(count)], dtype=np.uint8).reshape(count, n, n)
+
+
+def generate_many(count, n=9, clues=0, seed=None, box=None, workers=1):
+	'''
+	input:
+	-----
+		* count: the number of puzzles to generate;
+		* n, clues, box: see 'generate';
+		* seed: the seed of the random generator, the same seed (and number of
+			workers) always yields the same puzzles;
+		* workers: the number of worker processes which generate the puzzles;
+	output:
+	------
+		* returns a (count, n, n) uint8 NumPy array of puzzles, each one with a unique
+			solution (see 'generate');
+	'''
+	workers = max(1, min(workers, count))
+	seeds = np.random.SeedSequence(seed).spawn(workers)
+	sizes = [len(chunk) for chunk in np.array_split(np.arange(count), workers)]
+	if workers == 1:
+		return _generate_chunk(count, n, clues, seeds[0], box)
+
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		futures = [executor.submit(_generate_chunk, size, n, clues, chunk_seed, box) for size, chunk_seed in zip(sizes, seeds)]
+		return np.concatenate([future.result() for future in futures])
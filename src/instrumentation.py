@@ -0,0 +1,130 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Lightweight instrumentation of the solving phases: a 'SolveStats' object
+	collects the time spent in each phase and values such as the model size
+	or the solver status, forwarding every measurement to its callbacks
+	(e. g., to feed a metrics pipeline). 'NULL_STATS', used by default,
+	discards everything at (nearly) no cost.
+	---------------------------------------------------------------
+'''
+import time
+
+
+class SolveStats:
+	"""
+	Collects the measurements of the solves it's given to.
+	"""
+	__slots__ = ('labels', 'timings', 'values', 'callbacks')
+	enabled = True
+
+	def __init__(self, callbacks=(), **labels):
+		'''
+		input:
+		-----
+			* callbacks: functions called as callback(kind, name, value, labels) on each
+				measurement, where kind is 'time' (for a phase duration, in milliseconds)
+				or 'value', and labels is the dict of labels of this object;
+			* labels: extra labels describing the solve (e. g., the request id), the
+				grid size n and the engine are added by 'nsudoku.Sudoku';
+		'''
+		self.labels = labels
+		self.timings = {}
+		self.values = {}
+		self.callbacks = list(callbacks)
+
+	def phase(self, name):
+		'''
+		output:
+		------
+			* returns a context manager which adds the time spent within it to the
+				phase 'name';
+		'''
+		return _Phase(self, name)
+
+	def add_time(self, name, milliseconds):
+		'''
+		output:
+		------
+			* adds 'milliseconds' to the time spent in the phase 'name';
+		'''
+		self.timings[name] = self.timings.get(name, 0) + milliseconds
+		for callback in self.callbacks:
+			callback('time', name, milliseconds, self.labels)
+
+	def record(self, name, value):
+		'''
+		output:
+		------
+			* records 'value' (e. g., a count or a status) under 'name';
+		'''
+		self.values[name] = value
+		for callback in self.callbacks:
+			callback('value', name, value, self.labels)
+
+	def to_dict(self):
+		'''
+		output:
+		------
+			* returns the labels, phases timings (in milliseconds) and values collected
+				so far, as a JSON serializable dict;
+		'''
+		return {'labels': dict(self.labels), 'timings_ms': dict(self.timings), 'values': dict(self.values)}
+
+
+class _Phase:
+	"""
+	Context manager timing a single phase of a 'SolveStats'.
+	"""
+	__slots__ = ('stats', 'name', 'start')
+
+	def __init__(self, stats, name):
+		self.stats = stats
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *exception):
+		self.stats.add_time(self.name, (time.perf_counter() - self.start) * 1000)
+		return False
+
+
+class _NullPhase:
+	"""
+	Context manager which does nothing.
+	"""
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exception):
+		return False
+
+
+class _NullStats:
+	"""
+	A 'SolveStats' which discards every measurement.
+	"""
+	__slots__ = ()
+	enabled = False
+	labels = {}
+
+	def phase(self, name):
+		return _NULL_PHASE
+
+	def add_time(self, name, milliseconds):
+		pass
+
+	def record(self, name, value):
+		pass
+
+	def to_dict(self):
+		return {'labels': {}, 'timings_ms': {}, 'values': {}}
+
+
+_NULL_PHASE = _NullPhase()
+NULL_STATS = _NullStats()
@@ -33,13 +33,32 @@
 	----------------------------------------------------------------------------------------
 """
 from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+from instrumentation import NULL_STATS
 import numpy as np
+import os
+import time
 
 
 VAR_TYPE_BINARY = 0
 VAR_TYPE_INTEGER = 1
 VAR_TYPE_CONTINUOUS = 2
 
+STATUS_OPTIMAL = pywraplp.Solver.OPTIMAL
+STATUS_FEASIBLE = pywraplp.Solver.FEASIBLE
+STATUS_INFEASIBLE = pywraplp.Solver.INFEASIBLE
+STATUS_NOT_SOLVED = pywraplp.Solver.NOT_SOLVED
+STATUS_MODEL_INVALID = pywraplp.Solver.MODEL_INVALID
+
+# maps the CP-SAT solver statuses to the ones above
+CPSAT_STATUS = {
+	cp_model.OPTIMAL: STATUS_OPTIMAL,
+	cp_model.FEASIBLE: STATUS_FEASIBLE,
+	cp_model.INFEASIBLE: STATUS_INFEASIBLE,
+	cp_model.MODEL_INVALID: STATUS_MODEL_INVALID,
+	cp_model.UNKNOWN: STATUS_NOT_SOLVED,
+}
+
 
 def solver_infinity():
 	'''
@@ -50,87 +69,61 @@ def solver_infinity():
 	return pywraplp.Solver_Infinity()
 
 
-def solve_lp(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC', hint=[], num_threads=1):
+def _sparse_coefficients(C, A, lb, ub):
 	'''
-	This function solves a given linear programming (LP) of the following type:
-			max/min 	Cx
-				s.t.	lb <= Ax <= ub
-						vars_properties[i][j] <= x <= vars_properties[i][j+1]
-						x belongs to {binary, integer, continuous}
-	intput:
-	------
-		* C: the objective function to minimize or maximize as a 1D numpy array;
-		* A: the constraints coefficients as a 2D numpy array;
-		* lb: the lower bounds for each constraint as a 1D numpy array;
-		* ub: the upper bounds for each constraint as a 1D numpy array;
-		* vars_properties: a dictionary keyed by indexes of decision variables which defines the properties of each var as explained below:
-			* if method is 'BOP', vars_properties won't be considered;
-			* if method is 'CBC':
-				* "vars_properties" is a dict keyed by indexes of decision variables, mapping to 3-uples: (var_type, lower_bound, upper_bound)
-				* as long as "lower_bound" is always less or equal to "upper_bound", their values are irrestricted floats
-				* "var_type" may assyme 3 different values: 0 means binary, 1 means integer, 2 means continuous, refer to the constants "VAR_TYPE_BINARY", "VAR_TYPE_INTEGER", "VAR_TYPE_CONTINUOUS" in this file to use one of the supported variable types;
-				* if "var_type" is set to "VAR_TYPE_BINARY", the "lower_bound" must always be 0 and the "upper_bound" must always be 1 or an exception will be thrown
-				* any missing variables in vars_properties dict will be assumed to be integer ranging between [0, +infinity).
-			* if method is 'CLP', vars_properties is a dict keyed by indexes of decision variables, mapping to 2-uples: (lower_bound, upper_bound);
-				* as long as "lower_bound" is always less or equal than "upper_bound", their values are unrestricted floats
-				* all variables are assumed to be continuous;
-				* any missing variables in "vars_properties" dict will be assumed to be continuous ranging between [0, +infinity);
-		* maximization: True if the LP model is to be maximized, False if it is to be minimized;
-		* method: a non-casesensitive string which defines which underneath solver structure provided by Google ORTools to be used:
-			* 'BOP': binary integer programming, all decision variables belongs to {0, 1} and the contents of "vars_properties" is ignored;
-			* 'CBC': mixed integer programming, where variables may be binary, integer or continuous, as specified by "vars_properties";
-			* 'CLP': regular linear programming, where variables are always continuous and their interval is defined by "vars_properties";
-		* num_threads: the number of threads to be used on the optimization, default is 1. Note that there are platforms which doesn't support more than 1 thread;
 	output:
 	------
-		The possible outputs are:
-			* C*: the optimum objective value
-			* X*: optimum solution as a 1D numpy array (in case of alternate optima this array is a single possible optimum solution)
-			* status: the resulting status of the optimization, which could be: optimum, alternate optima, infeasible and unbounded
-			* time: the time needed to complete the optimization task in milliseconds
-			* iters: the number of iterations demanded to find the optimum solution
-			* bb_nodes: the number of branch and bound nodes created for solving an integer programming model
-
-		The actual output depends on the choosen "method", based on what they support:
-			* method 'BOP' returns:
-				* C*
-				* X*
-				* status
-				* time
-			* method 'CBC' returns:
-				* C*
-				* X*
-				* status
-				* time
-				* iters
-				* bb_nodes
-			* method 'CLP' returns:
-				* C*
-				* X*
-				* status
-				* time
-				* iters
-	Exceptions:
-	----------
-		Raises an exception of type "Exception", each with it's own customized message, due to model inconsistency problems, in the following cases:
-			* the number of variables (length over axis 0) in C is different than the number of variables (columns) in A;
-			* the number of constraints (length over axis 0) in A, lb and ub mismatch;
-			* the number of variables (keys) in "vars_properties" is greater than the number of variables (columns in A) in the model;
-			* if method is 'CBC' and the size of tuples in "vars_properties" is not exactly 3;
-			* if method is 'CBC' and the first element in any 3-uple in "vars_properties" is not VAR_TYPE_BINARY, VAR_TYPE_INTEGER or VAR_TYPE_CONTINUOUS;
-			* if method is 'CBC' and the first element in any 3-uple in "vars_properties" is VAR_TYPE_BINARY but the lower_bound is not 0 or the upper_bound is not 1;
-			* if method is 'CLP' and the size of tuples in "vars_properties" is not exactly 2;
-			* if method is 'CBC' or 'CLP' and for any uple found in "vars_properties" the lower_bound is strictly greater than the upper_bound
-			* independently of method, if the k-th item in lb is strictly greater than the corresponding k-th item in ub for any valid k
-
+		* the number of variables in the model;
+		* the number of constraints in the model;
+		* a list where the k-th constraint's nonzero coefficients lie between positions
+			k and k + 1 of the lists below (as in a CSR matrix's row pointer);
+		* a list holding the variable index of each nonzero coefficient;
+		* a list holding the value of each nonzero coefficient;
 	'''
-	if C.shape[0] != A.shape[1]:
+	if isinstance(A, tuple):
+		if len(A) != 3:
+			raise Exception('Sparse constraints coefficients must be given as a 3-uple (rows, columns, values).')
+		rows, cols, values = (np.asarray(item).ravel() for item in A)
+		if not (rows.shape[0] == cols.shape[0] == values.shape[0]):
+			raise Exception('The sparse constraints coefficients have rows, columns and values of different lengths.')
+		shape = (lb.shape[0], C.shape[0])
+		if rows.shape[0] > 0 and (rows.min() < 0 or rows.max() >= shape[0] or cols.min() < 0 or cols.max() >= shape[1]):
+			raise Exception('The sparse constraints coefficients reference variables or constraints outside of the model.')
+	elif hasattr(A, 'tocoo'):
+		coo = A.tocoo()
+		rows, cols, values, shape = coo.row, coo.col, coo.data, coo.shape
+	else:
+		shape = A.shape
+		rows, cols = np.nonzero(A)
+		values = A[rows, cols]
+
+	if C.shape[0] != shape[1]:
 		raise Exception('The number of variables in C and A doesn\'t match.')
-	if (A.shape[0] != lb.shape[0]) or (A.shape[0] != ub.shape[0]):
+	if (shape[0] != lb.shape[0]) or (shape[0] != ub.shape[0]):
 		raise Exception('The number of variables in lb, ub and A doesn\'t match.')
 
-	n = A.shape[1]
-	c = A.shape[0]
+	# drops explicit zeros and sorts the coefficients by constraint
+	nonzero = values != 0
+	rows, cols, values = rows[nonzero], cols[nonzero], values[nonzero]
+	order = np.argsort(rows, kind='stable')
+	rows_start = np.searchsorted(rows[order], np.arange(shape[0] + 1))
+
+	return shape[1], shape[0], rows_start.tolist(), cols[order].tolist(), values[order].tolist()
+
+
+def create_solver(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC', num_threads=1, stats=NULL_STATS):
+	'''
+	Builds, without solving it, the Google OR-Tools solver instance for the given LP,
+	so it may be solved many times over (for instance, by 'resolve_lp'). The inputs and
+	the exceptions raised are the same as those of 'solve_lp', and the size of the model
+	(its number of variables, constraints and nonzero coefficients) is recorded on 'stats'.
+	output:
+	------
+		* the solver instance
+		* the list of its decision variables, sorted as the columns of A
+	'''
+	n, c, rows_start, cols, values = _sparse_coefficients(C, A, lb, ub)
+	_record_size(stats, n, c, len(values))
 	X = []
 
 	# determine the solver method
@@ -140,12 +133,12 @@ def solve_lp(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC',
 		solver_method = pywraplp.Solver.BOP_INTEGER_PROGRAMMING
 		solver_name = 'binary_integer_programming'
 	elif method.upper() == 'CBC':
-		if len(vars_properties.keys()) > A.shape[1]:
+		if len(vars_properties.keys()) > n:
 			raise Exception('Too many variables properties for too few decision variables in the model.')
 		solver_method = pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING
 		solver_name = 'mixed_integer_programming'
 	elif method.upper() == 'CLP':
-		if len(vars_properties.keys()) > A.shape[1]:
+		if len(vars_properties.keys()) > n:
 			raise Exception('Too many variables properties for too few decision variables in the model.')
 		solver_method = pywraplp.Solver.CLP_LINEAR_PROGRAMMING
 		solver_name = 'continuous_linear_programming'
@@ -217,8 +210,8 @@ def solve_lp(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC',
 			raise Exception('Inconsistent '+str(k)+'-th constraint bounds: the lower bound "'+str(kth_lb)+'" is greater than the upper bound "'+str(kth_ub)+'".')
 		
 		constraint = solver.RowConstraint(kth_lb, kth_ub, 'constraint[%i]' % k)
-		for v in range(0, n):
-			constraint.SetCoefficient(X[v], A.item(k, v))
+		for v in range(rows_start[k], rows_start[k + 1]):
+			constraint.SetCoefficient(X[cols[v]], values[v])
 
 	# sets the LP objective
 	objective = solver.Objective()
@@ -229,14 +222,171 @@ def solve_lp(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC',
 	else:
 		objective.SetMinimization()
 
+	return solver, X
+
+
+def solve_lp(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC', hint=[], num_threads=1, time_limit=None, stats=NULL_STATS):
+	'''
+	This function solves a given linear programming (LP) of the following type:
+			max/min 	Cx
+				s.t.	lb <= Ax <= ub
+						vars_properties[i][j] <= x <= vars_properties[i][j+1]
+						x belongs to {binary, integer, continuous}
+	intput:
+	------
+		* C: the objective function to minimize or maximize as a 1D numpy array;
+		* A: the constraints coefficients, given either as:
+			* a dense 2D numpy array;
+			* a sparse matrix exposing a "tocoo()" method (for instance, any scipy.sparse matrix);
+			* a 3-uple of 1D arrays (rows, columns, values) in coordinate (COO) format, where the
+				number of constraints is taken from "lb" and the number of variables from "C";
+			only the nonzero coefficients are pushed into the solver, whatever the format;
+		* lb: the lower bounds for each constraint as a 1D numpy array;
+		* ub: the upper bounds for each constraint as a 1D numpy array;
+		* vars_properties: a dictionary keyed by indexes of decision variables which defines the properties of each var as explained below:
+			* if method is 'BOP', vars_properties won't be considered;
+			* if method is 'CBC' or 'CPSAT':
+				* "vars_properties" is a dict keyed by indexes of decision variables, mapping to 3-uples: (var_type, lower_bound, upper_bound)
+				* as long as "lower_bound" is always less or equal to "upper_bound", their values are irrestricted floats
+				* "var_type" may assyme 3 different values: 0 means binary, 1 means integer, 2 means continuous, refer to the constants "VAR_TYPE_BINARY", "VAR_TYPE_INTEGER", "VAR_TYPE_CONTINUOUS" in this file to use one of the supported variable types;
+				* if "var_type" is set to "VAR_TYPE_BINARY", the "lower_bound" must always be 0 and the "upper_bound" must always be 1 or an exception will be thrown
+				* any missing variables in vars_properties dict will be assumed to be integer ranging between [0, +infinity).
+				* if method is 'CPSAT', continuous variables aren't supported and the bounds of integer variables are rounded towards the inside of their interval, where +infinity (and -infinity) is replaced by the largest (and smallest) 32 bits integer;
+			* if method is 'CLP', vars_properties is a dict keyed by indexes of decision variables, mapping to 2-uples: (lower_bound, upper_bound);
+				* as long as "lower_bound" is always less or equal than "upper_bound", their values are unrestricted floats
+				* all variables are assumed to be continuous;
+				* any missing variables in "vars_properties" dict will be assumed to be continuous ranging between [0, +infinity);
+		* maximization: True if the LP model is to be maximized, False if it is to be minimized;
+		* method: a non-casesensitive string which defines which underneath solver structure provided by Google ORTools to be used:
+			* 'BOP': binary integer programming, all decision variables belongs to {0, 1} and the contents of "vars_properties" is ignored;
+			* 'CBC': mixed integer programming, where variables may be binary, integer or continuous, as specified by "vars_properties";
+			* 'CLP': regular linear programming, where variables are always continuous and their interval is defined by "vars_properties";
+			* 'CPSAT': the CP-SAT constraint programming solver, where variables may be binary or integer, as specified by "vars_properties", and every coefficient in C and A must be an integer;
+		* hint: an initial solution (one value per variable) the solver may start from, defaults to none;
+		* num_threads: the number of threads to be used on the optimization, default is 1. Note that there are platforms which doesn't support more than 1 thread; for 'CPSAT', this is the number of parallel search workers, capped at the number of CPUs;
+		* time_limit: the maximum wall-clock time, in milliseconds, given to the solver, defaults to None (no limit); whenever it's reached, the best solution found so far (if any) is returned;
+		* stats: an 'instrumentation.SolveStats' which records the time spent building the model ('build') and searching for its solution ('search'), the size of the model, the status and, whenever available, the number of iterations and of branch and bound nodes; defaults to no instrumentation;
+	output:
+	------
+		The possible outputs are:
+			* C*: the optimum objective value
+			* X*: optimum solution as a 1D numpy array (in case of alternate optima this array is a single possible optimum solution)
+			* status: the resulting status of the optimization, which could be: optimum, alternate optima, infeasible and unbounded
+			* time: the time needed to complete the optimization task in milliseconds
+			* iters: the number of iterations demanded to find the optimum solution
+			* bb_nodes: the number of branch and bound nodes created for solving an integer programming model
+
+		The actual output depends on the choosen "method", based on what they support:
+			* method 'BOP' returns:
+				* C*
+				* X*
+				* status
+				* time
+			* method 'CBC' returns:
+				* C*
+				* X*
+				* status
+				* time
+				* iters
+				* bb_nodes
+			* method 'CLP' returns:
+				* C*
+				* X*
+				* status
+				* time
+				* iters
+			* method 'CPSAT' returns (its status is given by the same constants as the other methods, see "CPSAT_STATUS"):
+				* C*
+				* X*
+				* status
+				* time
+	Exceptions:
+	----------
+		Raises an exception of type "Exception", each with it's own customized message, due to model inconsistency problems, in the following cases:
+			* the number of variables (length over axis 0) in C is different than the number of variables (columns) in A;
+			* the number of constraints (length over axis 0) in A, lb and ub mismatch;
+			* the number of variables (keys) in "vars_properties" is greater than the number of variables (columns in A) in the model;
+			* if method is 'CBC' and the size of tuples in "vars_properties" is not exactly 3;
+			* if method is 'CBC' and the first element in any 3-uple in "vars_properties" is not VAR_TYPE_BINARY, VAR_TYPE_INTEGER or VAR_TYPE_CONTINUOUS;
+			* if method is 'CBC' and the first element in any 3-uple in "vars_properties" is VAR_TYPE_BINARY but the lower_bound is not 0 or the upper_bound is not 1;
+			* if method is 'CLP' and the size of tuples in "vars_properties" is not exactly 2;
+			* if method is 'CBC' or 'CLP' and for any uple found in "vars_properties" the lower_bound is strictly greater than the upper_bound
+			* independently of method, if the k-th item in lb is strictly greater than the corresponding k-th item in ub for any valid k
+			* if method is 'CPSAT' and any variable is continuous or any coefficient in C or A isn't an integer
+
+	'''
+	if method.upper() == 'CPSAT':
+		return _solve_cpsat(C, A, lb, ub, vars_properties, maximization, hint, num_threads, time_limit, stats)
+
+	with stats.phase('build'):
+		solver, X = create_solver(C, A, lb, ub, vars_properties, maximization, method, num_threads, stats)
+
 	# sets a hint for a initial basic feasible solution
 	if len(hint) > 0:
-		if len(hint) != n:
+		if len(hint) != len(X):
 			raise Exception('The hint list has an inconsistent number of elements:', len(hint))
 		solver.SetHint(solver.variables(), hint)
+	if time_limit is not None:
+		solver.SetTimeLimit(int(time_limit))
 
 	# attempts to solve the problem
-	status = solver.Solve()
+	with stats.phase('search'):
+		status = solver.Solve()
+	return _outputs(solver, X, method, status, stats)
+
+
+def resolve_lp(solver, X, method, lower_bounds=None, upper_bounds=None, hint=[], time_limit=None, stats=NULL_STATS):
+	'''
+	Solves once again a solver instance built by 'create_solver', after resetting the
+	bounds of all of its decision variables, which is much cheaper than building a new
+	solver whenever only the variables bounds change between two solves.
+	intput:
+	------
+		* solver, X: the outputs of 'create_solver';
+		* method: the same method given to 'create_solver';
+		* lower_bounds: the new lower bounds of the variables, as a 1D numpy array;
+		* upper_bounds: the new upper bounds of the variables, as a 1D numpy array;
+			if both bounds are None, the bounds currently set on the variables are kept
+			(e. g., when only a few of them were changed in place, by 'SetBounds');
+		* hint, time_limit, stats: just like in 'solve_lp', where the time spent setting
+			the bounds is recorded as the 'build' phase;
+	output:
+	------
+		The same outputs of 'solve_lp' for the given method.
+	'''
+	if lower_bounds is not None or upper_bounds is not None:
+		if lower_bounds is None or upper_bounds is None or len(lower_bounds) != len(X) or len(upper_bounds) != len(X):
+			raise Exception('The number of variables bounds and decision variables doesn\'t match.')
+		with stats.phase('build'):
+			for variable, kth_lb, kth_ub in zip(X, lower_bounds.tolist(), upper_bounds.tolist()):
+				if kth_lb > kth_ub:
+					raise Exception('Inconsistent variable bounds: the lower bound "'+str(kth_lb)+'" is greater than the upper bound "'+str(kth_ub)+'".')
+				variable.SetBounds(kth_lb, kth_ub)
+
+	if len(hint) > 0:
+		if len(hint) != len(X):
+			raise Exception('The hint list has an inconsistent number of elements:', len(hint))
+		solver.SetHint(solver.variables(), hint)
+	solver.SetTimeLimit(0 if time_limit is None else int(time_limit))
+
+	with stats.phase('search'):
+		status = solver.Solve()
+	return _outputs(solver, X, method, status, stats)
+
+
+def _outputs(solver, X, method, status, stats=NULL_STATS):
+	'''
+	output:
+	------
+		* the outputs of 'solve_lp', for the given method, right after the solver ran,
+			which are also recorded on 'stats';
+	'''
+	if stats.enabled:
+		stats.record('status', status)
+		if method.upper() in ('CBC', 'CLP'):
+			stats.record('iterations', solver.iterations())
+		if method.upper() == 'CBC':
+			stats.record('nodes', solver.nodes())
 	if method.upper() == 'BOP':
 		return solver.Objective().Value(), np.array([variable.solution_value() for variable in X]), status, solver.wall_time()
 	elif method.upper() == 'CBC':
@@ -244,3 +394,126 @@ def solve_lp(C, A, lb, ub, vars_properties={}, maximization=True, method='CBC',
 	elif method.upper() == 'CLP':
 		return solver.Objective().Value(), np.array([variable.solution_value() for variable in X]), status, solver.wall_time(), solver.iterations()
 
+
+def _solve_cpsat(C, A, lb, ub, vars_properties, maximization, hint, num_threads, time_limit, stats):
+	'''
+	output:
+	------
+		* solves the given model with the CP-SAT solver, see 'solve_lp';
+	'''
+	build_start = time.perf_counter()
+	n, c, rows_start, cols, values = _sparse_coefficients(C, A, lb, ub)
+	_record_size(stats, n, c, len(values))
+	if len(vars_properties.keys()) > n:
+		raise Exception('Too many variables properties for too few decision variables in the model.')
+	if any(value != int(value) for value in values) or any(value != int(value) for value in C.tolist()):
+		raise Exception('The "CPSAT" method only supports integer coefficients in C and A.')
+	model = cp_model.CpModel()
+	X = []
+
+	# creates the variables, setting all their properties
+	for k in range(0, n):
+		kth_type = VAR_TYPE_INTEGER
+		kth_lb = 0.0
+		kth_ub = np.inf
+		if k in vars_properties:
+			try:
+				kth_type, kth_lb, kth_ub = vars_properties[k]
+			except ValueError:
+				raise Exception('The "CPSAT: method expected tuples of size exactly 3 in the "vars_properties" dictionary.')
+		if kth_lb > kth_ub:
+			raise Exception('Inconsistent '+str(k)+'-th variable bounds: the lower bound "'+str(kth_lb)+'" is greater than the upper bound "'+str(kth_ub)+'".')
+
+		if kth_type == VAR_TYPE_BINARY:
+			if kth_lb != 0 or kth_ub != 1:
+				raise Exception('Binary variables must always have their lower bound set to 0 and their upper bound set to 1.')
+			variable = model.NewBoolVar('x[%i]' % k)
+		elif kth_type == VAR_TYPE_INTEGER:
+			variable = model.NewIntVar(_cpsat_bound(kth_lb, True), _cpsat_bound(kth_ub, False), 'x[%i]' % k)
+		elif kth_type == VAR_TYPE_CONTINUOUS:
+			raise Exception('The "CPSAT" method doesn\'t support continuous variables.')
+		else:
+			raise Exception('Unknown variable type in vars_properties:', kth_type)
+		X.append(variable)
+
+	# creates the constraints, setting all their properties
+	for k in range(0, c):
+		kth_lb = lb.item(k)
+		kth_ub = ub.item(k)
+		if kth_lb > kth_ub:
+			raise Exception('Inconsistent '+str(k)+'-th constraint bounds: the lower bound "'+str(kth_lb)+'" is greater than the upper bound "'+str(kth_ub)+'".')
+		expression = sum(int(values[v]) * X[cols[v]] for v in range(rows_start[k], rows_start[k + 1]))
+		model.AddLinearConstraint(expression, _cpsat_bound(kth_lb, True), _cpsat_bound(kth_ub, False))
+
+	# sets the objective
+	objective = sum(int(C.item(k)) * X[k] for k in range(n))
+	if maximization:
+		model.Maximize(objective)
+	else:
+		model.Minimize(objective)
+
+	# sets a hint for a initial feasible solution
+	if len(hint) > 0:
+		if len(hint) != n:
+			raise Exception('The hint list has an inconsistent number of elements:', len(hint))
+		for variable, value in zip(X, hint):
+			model.AddHint(variable, int(round(value)))
+
+	stats.add_time('build', (time.perf_counter() - build_start) * 1000)
+
+	solver = cp_model.CpSolver()
+	# extra workers beyond the number of CPUs only take CPU time away from the others
+	solver.parameters.num_search_workers = max(1, min(int(num_threads), os.cpu_count() or 1))
+	if time_limit is not None:
+		solver.parameters.max_time_in_seconds = time_limit / 1000
+	with stats.phase('search'):
+		status = solver.Solve(model)
+	record_cpsat(stats, solver, status)
+
+	if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+		objective_value = solver.ObjectiveValue()
+		solution = np.array([solver.Value(variable) for variable in X])
+	else:
+		objective_value = 0
+		solution = np.zeros(shape=n)
+	return objective_value, solution, CPSAT_STATUS[status], int(round(solver.WallTime() * 1000))
+
+
+def _cpsat_bound(bound, lower):
+	'''
+	output:
+	------
+		* returns 'bound' as an integer CP-SAT bound, rounding it towards the inside of
+			the interval ('lower' tells whether it's a lower bound) and clipping infinite
+			values to the 32 bits integers range;
+	'''
+	if bound >= cp_model.INT32_MAX:
+		return cp_model.INT32_MAX
+	if bound <= cp_model.INT32_MIN:
+		return cp_model.INT32_MIN
+	return int(np.ceil(bound)) if lower else int(np.floor(bound))
+
+
+def record_cpsat(stats, solver, status):
+	'''
+	output:
+	------
+		* records on 'stats' the status (as one of the constants of this file), number of
+			branches and of conflicts of a CP-SAT solver which just ran;
+	'''
+	if stats.enabled:
+		stats.record('status', CPSAT_STATUS[status])
+		stats.record('nodes', solver.NumBranches())
+		stats.record('conflicts', solver.NumConflicts())
+
+
+def _record_size(stats, num_vars, num_constraints, nonzeros):
+	'''
+	output:
+	------
+		* records on 'stats' the size of a model;
+	'''
+	if stats.enabled:
+		stats.record('num_vars', num_vars)
+		stats.record('num_constraints', num_constraints)
+		stats.record('nonzeros', nonzeros)
@@ -28,8 +28,71 @@
 	This file is built using the NumPy library (https://numpy.org/index.html)
 	----------------------------------------------------------------------------------------
 '''
-from linear_programming_solver import solve_lp, solver_infinity
+from linear_programming_solver import solve_lp, create_solver, resolve_lp, solver_infinity, STATUS_OPTIMAL, STATUS_INFEASIBLE, STATUS_NOT_SOLVED, VAR_TYPE_BINARY
+from sudoku_structure import structural_coefficients, box_shape as get_box_shape
+from propagation import propagate, SOLVED, CONTRADICTION
+from exact_cover import search, count_solutions, TimeLimitReached
+from validation import is_valid
+from constraint_programming import solve_cp
+from instrumentation import NULL_STATS
+from functools import lru_cache
+from threading import Lock
 import numpy as np
+import time
+
+
+_structural_solver_lock = Lock()
+# the largest n whose linear programming model may be built as a dense matrix (of
+# roughly 4 * n ** 5 coefficients)
+DENSE_MAX_N = 25
+# the largest n whose puzzles are solved by default with the native exact cover search,
+# beyond which sparse puzzles may take it arbitrarily long
+BITMASK_MAX_N = 16
+
+
+def default_engine(n):
+	'''
+	output:
+	------
+		* returns the engine used by 'Sudoku.solve' by default for an n-sudoku: 'bitmask'
+			up to 'BITMASK_MAX_N', or 'cpsat' otherwise;
+	'''
+	return 'bitmask' if n <= BITMASK_MAX_N else 'cpsat'
+
+
+def structural_solver(n, num_threads=9, box=None):
+	'''
+	output:
+	------
+		* returns a new Google OR-Tools BOP solver instance, and its decision variables
+			(indexed by 'Sudoku.indexing_encoder'), holding only the structural
+			constraints of an n-sudoku (whose boxes default to
+			'sudoku_structure.box_shape(n)'), where the clues are meant to be given as
+			variables bounds (a lower bound of 1 for each clue's variable);
+	'''
+	rows, cols = structural_coefficients(n, box)
+	b = np.ones(shape=4 * n ** 2, dtype=int)
+	return create_solver(
+		C=np.ones(shape=n ** 3, dtype=int),
+		A=(rows, cols, np.ones(shape=rows.shape[0], dtype=int)),
+		lb=b,
+		ub=b,
+		maximization=False,
+		method="BOP",
+		num_threads=num_threads,
+	)
+
+
+@lru_cache(maxsize=4)
+def _structural_solver(n, box):
+	'''
+	output:
+	------
+		* returns the 'structural_solver' of an n-sudoku which gets reused by every
+			n-sudoku (with the same boxes) solved with
+			'Sudoku.linear_programming_solve(reuse_solver=True)';
+	'''
+	return structural_solver(n, box=box)
 
 
 class Sudoku:
@@ -37,20 +100,44 @@ class Sudoku:
 	Class defining nSudoku utilities to create and solve it.
 	"""
 
-	def __init__(self, sudoku=None, n=9):
-		if not (n ** (1 / 2)).is_integer():
-			raise Exception('[n-sudoku solver] n=' + str(n) + ' have an invalid (non-integer) square root: "' + str(
-				(n ** (1 / 2))) + '".')
+	def __init__(self, sudoku=None, n=9, stats=None, box_shape=None):
+		"""
+		input:
+		-----
+			* sudoku: the initial state as a 2D NumPy array, where 0 marks an empty
+				cell, defaults to None, where a random state gets created;
+			* n: the size of the sudoku;
+			* stats: an 'instrumentation.SolveStats' recording the timings of each
+				phase (model building, presolve, solver building, search, decoding)
+				and values such as the model size and the status of the solves of
+				this sudoku, defaults to None (no instrumentation);
+			* box_shape: the (rows, columns) dimensions of each box, such as (2, 3) for a
+				6-sudoku or (3, 4) for a 12-sudoku, defaults to None, where square boxes
+				are used whenever n is a perfect square (see 'sudoku_structure.box_shape');
+		Exceptions:
+		----------
+			Raises an exception of type "Exception" if the boxes don't split an n by n
+			grid, or if 'box_shape' isn't given and n can't be split into boxes.
+		"""
+		self.box = get_box_shape(n, box_shape)
 		self.n = n
 		if sudoku is not None:
 			self.sudoku = sudoku
 		else:
 			self.sudoku = self.random()
 
+		self.clues = self.sudoku.copy()
 		self.solved = False
 		self.lp_solution = None
 		self.indexing_encoder = lambda i, j, k: (i * self.n + j) * self.n + k
 		self.tableau = {}
+		self.presolved = None
+		self.candidates = None
+		self.presolve_status = None
+		self.winner = None
+		self.stats = NULL_STATS if stats is None else stats
+		if self.stats.enabled:
+			self.stats.labels['n'] = n
 
 	def _lpsolution2sudoku(self):
 		"""
@@ -59,11 +146,21 @@ class Sudoku:
 			* writes to 'self.sudoku' the solution computed using
 				linear programming;
 		"""
-		for i in range(0, self.n):
-			for j in range(0, self.n):
-				for k in range(0, self.n):
-					if self.lp_solution.item(self.indexing_encoder(i, j, k)) != 0:
-						self.sudoku.itemset(i, j, k + 1)
+		with self.stats.phase('decode'):
+			# the solution is indexed by 'self.indexing_encoder', i. e., as a (i, j, k) array
+			solution = self.lp_solution.reshape(self.n, self.n, self.n)
+			assigned = (solution != 0).any(axis=2)
+			self.sudoku[assigned] = solution.argmax(axis=2)[assigned] + 1
+
+	def is_valid(self):
+		"""
+		output:
+		------
+			* returns True if the sudoku, in its current state, is completely filled,
+				valid (no digit repeats within a row, column or box) and keeps all of
+				the clues it was created with;
+		"""
+		return is_valid(self.sudoku, self.clues, self.box)
 
 	def get_puzzle_state(self):
 		"""
@@ -74,6 +171,24 @@ class Sudoku:
 		"""
 		return self.sudoku
 
+	def count_solutions(self, limit=2):
+		"""
+		output:
+		------
+			* returns the number of solutions of the sudoku in its current state,
+				counting up to 'limit' solutions at most, which is done by a native
+				exact cover search stopping as soon as the limit is reached;
+		"""
+		return count_solutions(self.sudoku, self.box, limit=limit)
+
+	def is_unique(self):
+		"""
+		output:
+		------
+			* returns True if the sudoku, in its current state, has exactly one solution;
+		"""
+		return self.count_solutions(limit=2) == 1
+
 	def random(self):
 		"""
 		output:
@@ -85,15 +200,15 @@ class Sudoku:
 		"""
 		sudoku = np.zeros(shape=(self.n, self.n), dtype=int)
 
-		feasible_rows = []
-		feasible_columns = []
-		feasible_boxes = []
-		for k in range(0, self.n):
-			feasible_rows.append(set(range(1, self.n + 1)))
-			feasible_columns.append(set(range(1, self.n + 1)))
-			feasible_boxes.append(set(range(1, self.n + 1)))
+		# the digits still feasible within each row, column and box, as bitmasks
+		# (where bit k stands for the digit k + 1)
+		full = (1 << self.n) - 1
+		feasible_rows = [full] * self.n
+		feasible_columns = [full] * self.n
+		feasible_boxes = [full] * self.n
 
-		box_index = lambda i, j: int(i / (self.n ** (1 / 2))) * int(self.n ** (1 / 2)) + int(j / (self.n ** (1 / 2)))
+		box_rows, box_cols = self.box
+		box_index = lambda i, j: (i // box_rows) * (self.n // box_cols) + j // box_cols
 
 		drafted_sudoku_cells = [(i, j) for i in range(0, self.n) for j in range(0, self.n)]
 		np.random.shuffle(drafted_sudoku_cells)
@@ -101,7 +216,8 @@ class Sudoku:
 
 		for i, j in drafted_sudoku_cells:
 			k = box_index(i, j)
-			intersection = list(feasible_rows[i] & feasible_columns[j] & feasible_boxes[k])
+			mask = feasible_rows[i] & feasible_columns[j] & feasible_boxes[k]
+			intersection = [digit + 1 for digit in range(0, self.n) if mask >> digit & 1]
 
 			if len(intersection) > 0:
 				draft_index = np.random.randint(len(intersection))
@@ -109,14 +225,50 @@ class Sudoku:
 
 				sudoku.itemset(i, j, draft)
 
-				feasible_rows[i].remove(draft)
-				feasible_columns[j].remove(draft)
-				feasible_boxes[k].remove(draft)
+				bit = 1 << (draft - 1)
+				feasible_rows[i] &= ~bit
+				feasible_columns[j] &= ~bit
+				feasible_boxes[k] &= ~bit
 
 		return sudoku
 
-	def linear_programming_model(self):
+	def presolve(self, pairs=False):
 		"""
+		input:
+		-----
+			* pairs: True to also apply the naked pairs and pointing rules,
+				besides the naked and hidden singles rules;
+		output:
+		------
+			Runs constraint propagation over the current sudoku state
+			(without changing it) and returns:
+				* the sudoku state with every cell fixed by propagation filled in;
+				* the candidates still free, as a (n, n, n) boolean NumPy array,
+					indexed just like 'self.indexing_encoder';
+				* the propagation status: 'propagation.SOLVED',
+					'propagation.STUCK' or 'propagation.CONTRADICTION';
+		"""
+		with self.stats.phase('presolve'):
+			self.presolved, self.candidates, self.presolve_status = propagate(self.sudoku, self.box, pairs=pairs)
+		if self.stats.enabled:
+			self.stats.record('presolve_fixed', int((self.presolved != 0).sum() - (self.sudoku != 0).sum()))
+			self.stats.record('presolve_status', self.presolve_status)
+		return self.presolved, self.candidates, self.presolve_status
+
+	def linear_programming_model(self, sparse=None, presolve=False, pairs=False):
+		"""
+		input:
+		-----
+			* sparse: if True, the constraints matrix A is kept in coordinate (COO)
+				format, i. e., as a 3-uple (rows, columns, values) of 1D NumPy arrays
+				holding only its nonzero coefficients, which is accepted as is by
+				'solve_lp'; otherwise, A is given as a dense 2D NumPy array, which is
+				only allowed up to 'DENSE_MAX_N'; defaults to None, where A is dense up
+				to 'DENSE_MAX_N' and sparse beyond it;
+			* presolve: if True, 'self.presolve' runs first and the model only holds
+				the (cell, digit) candidates left free by it, together with the
+				constraints not yet satisfied by the cells it fixed;
+			* pairs: forwarded to 'self.presolve';
 		output:
 		------
 			Computes a linear programming (LP) model of the format
@@ -127,6 +279,7 @@ class Sudoku:
 			and returns:
 				* a dict representing the LP tableau with the following values:
 					* 'constraint_coeffs': the constraints matrix A as a 2D NumPy array
+						(or as a COO 3-uple, if 'sparse' is True)
 					* 'obj_coeffs': coefficients of the objective function C
 					* 'upper_bounds': coefficients of the upper bounds represented by b
 					* 'lower_bounds': coefficients of the lower bounds represented by b
@@ -134,69 +287,89 @@ class Sudoku:
 						taking any (potential) slack variables into considerations;
 					* 'num_constraints': the amount of constraints, i. e., the number
 						of lines in matrix A
+					* 'sudoku': a copy of the sudoku state the model was built from
+				* if 'presolve' is True, the dict also holds:
+					* 'var_index': the 'self.indexing_encoder' index of each variable
+						(column) in A;
+					* 'fixed_vars': the 'self.indexing_encoder' indexes fixed to 1
+						by the presolve;
+					* 'presolve_status': the status returned by 'self.presolve';
+		Exceptions:
+		----------
+			Raises an exception of type "Exception" if 'sparse' is False and n is
+			greater than 'DENSE_MAX_N'.
 		"""
-		nonempty_values = 0
-		for i in range(0, self.n ** 2):
-			if self.sudoku.item(i) != 0:
-				nonempty_values += 1
-		# each X_ijk indicates cell ij with color k: either 0 or 1
-		A = np.zeros(shape=(4 * (self.n ** 2) + nonempty_values, self.n ** 3), dtype=int)
-		b = np.ones(shape=A.shape[0], dtype=int)
-
-		constraint = 0
-		# row constraints to avoid repetition of numbers
-		while constraint < (self.n ** 2):
-			for i in range(0, self.n):
-				for k in range(0, self.n):
-					for j in range(0, self.n):
-						A.itemset(constraint, self.indexing_encoder(i, j, k), 1)
-					constraint += 1
-
-		# column constraints to avoid repetition of numbers
-		while constraint < 2 * (self.n ** 2):
-			for j in range(0, self.n):
-				for k in range(0, self.n):
-					for i in range(0, self.n):
-						A.itemset(constraint, self.indexing_encoder(i, j, k), 1)
-					constraint += 1
-
-		# cell constraints to avoid assigning multiple numbers to a single cell
-		while constraint < 3 * (self.n ** 2):
-			for i in range(0, self.n):
-				for j in range(0, self.n):
-					for k in range(0, self.n):
-						A.itemset(constraint, self.indexing_encoder(i, j, k), 1)
-					constraint += 1
-
-		sqrtn = int(self.n ** (1 / 2))  # self.n always have an integer square root
-		# box constraints to avoid assigning the same numbers in a single box
-		for boxcol in range(0, sqrtn):
-			for boxrow in range(0, sqrtn):
-				for k in range(0, self.n):
-					for i in range(boxrow * sqrtn, (boxrow + 1) * sqrtn):
-						for j in range(boxcol * sqrtn, (boxcol + 1) * sqrtn):
-							A.itemset(constraint, self.indexing_encoder(i, j, k), 1)
-					constraint += 1
-
-		# pre assigned cell values constraint
-		for i in range(0, self.n):
-			for j in range(0, self.n):
-				cell_value = self.sudoku.item(i, j)
-				if cell_value != 0:
-					A.itemset(constraint, self.indexing_encoder(i, j, cell_value - 1), 1)
-					constraint += 1
+		if sparse is None:
+			sparse = self.n > DENSE_MAX_N
+		if not sparse and self.n > DENSE_MAX_N:
+			raise Exception('Dense models are only built up to n=' + str(DENSE_MAX_N) + ', use sparse=True for n=' + str(self.n) + '.')
+		start = time.perf_counter()
+		rows, cols = structural_coefficients(self.n, self.box)
+		num_vars = self.n ** 3
+		self.tableau = {}
+
+		if presolve:
+			grid, candidates, status = self.presolve(pairs=pairs)
+			fixed = grid.ravel() != 0
+			fixed_vars = np.flatnonzero(fixed) * self.n + grid.ravel()[fixed] - 1
+			free = (candidates & (grid == 0)[:, :, None]).ravel()
+			var_index = np.flatnonzero(free)
+
+			# drops the constraints already satisfied by a fixed variable and
+			# the coefficients of every variable which isn't free anymore
+			satisfied = np.zeros(shape=4 * self.n ** 2, dtype=bool)
+			satisfied[rows[np.isin(cols, fixed_vars)]] = True
+			keep = free[cols] & ~satisfied[rows]
+			remaining = np.flatnonzero(~satisfied)
+			rows = np.searchsorted(remaining, rows[keep])
+			cols = np.searchsorted(var_index, cols[keep])
+			constraint = remaining.shape[0]
+			num_vars = var_index.shape[0]
+
+			self.tableau['var_index'] = var_index
+			self.tableau['fixed_vars'] = fixed_vars
+			self.tableau['presolve_status'] = status
+		else:
+			# pre assigned cell values constraint
+			constraint = 4 * (self.n ** 2)
+			clues = np.flatnonzero(self.sudoku.ravel())
+			rows = np.concatenate([rows, np.arange(constraint, constraint + clues.shape[0])])
+			cols = np.concatenate([cols, clues * self.n + self.sudoku.ravel()[clues] - 1])
+			constraint += clues.shape[0]
+
+		if sparse:
+			A = (rows, cols, np.ones(shape=rows.shape[0], dtype=int))
+		else:
+			A = np.zeros(shape=(constraint, num_vars), dtype=int)
+			A[rows, cols] = 1
+		b = np.ones(shape=constraint, dtype=int)
 
 		self.tableau['constraint_coeffs'] = A
 		self.tableau['upper_bounds'] = b
 		self.tableau['lower_bounds'] = b
-		self.tableau['obj_coeffs'] = np.ones(shape=self.n ** 3, dtype=int)
-		self.tableau['num_vars'] = A.shape[1]
-		self.tableau['num_constraints'] = A.shape[0]
+		self.tableau['obj_coeffs'] = np.ones(shape=num_vars, dtype=int)
+		self.tableau['num_vars'] = num_vars
+		self.tableau['num_constraints'] = constraint
+		self.tableau['sudoku'] = self.sudoku.copy()
 
+		# the 'model' phase includes the 'presolve' phase, whenever there's one
+		self.stats.add_time('model', (time.perf_counter() - start) * 1000)
 		return self.tableau.copy()
 
-	def linear_programming_solve(self):
+	def linear_programming_solve(self, reuse_solver=False, num_threads=9, time_limit=None, method='BOP'):
 		"""
+		input:
+		-----
+			* reuse_solver: if True, the model built by 'self.linear_programming_model'
+				is ignored and the sudoku is solved by a solver instance shared by
+				all the n-sudokus of the same n (built only once per process), where
+				the clues are set as variables bounds rather than constraints;
+			* num_threads: the number of threads used by the solver, which should be
+				lowered whenever many sudokus get solved at once (see 'batch.solve_many');
+			* time_limit: the maximum wall-clock time, in milliseconds, given to the
+				solver, defaults to None (no limit);
+			* method: the 'solve_lp' method, either 'BOP' or 'CBC' (where every variable
+				is binary); the shared solver of 'reuse_solver' is always a BOP one;
 		output:
 		------
 			Uses, indirectly, the Google ORTools mixed integer programming solver:
@@ -208,20 +381,239 @@ class Sudoku:
 			* the time spent to find the solution, measured in milliseconds
 			* the number of iterations needed to find the solution
 		"""
+		self._label('lp')
+		if reuse_solver:
+			return self._shared_linear_programming_solve(num_threads, time_limit)
+		if 'var_index' in self.tableau:
+			return self._reduced_linear_programming_solve(num_threads, time_limit, method)
+
 		self.C, self.lp_solution, self.status, time_spent = solve_lp(
 							C=self.tableau['obj_coeffs'],
 							A=self.tableau['constraint_coeffs'],
 							lb=self.tableau['lower_bounds'],
 							ub=self.tableau['upper_bounds'],
-							vars_properties={},
+							vars_properties=self._vars_properties(method),
+							maximization=False,
+							method=method,
+							num_threads=num_threads,
+							time_limit=time_limit,
+							stats=self.stats,
+								)[:4]
+		self._lpsolution2sudoku()
+		self.solved = True
+		return self.C, self.lp_solution, self.status, time_spent
+
+	def _shared_linear_programming_solve(self, num_threads, time_limit):
+		"""
+		output:
+		------
+			Solves the sudoku with the shared solver instance of '_structural_solver',
+			the outputs are the same as the ones of 'self.linear_programming_solve'.
+		"""
+		lower_bounds = np.zeros(shape=self.n ** 3)
+		clues = np.flatnonzero(self.sudoku.ravel())
+		lower_bounds[clues * self.n + self.sudoku.ravel()[clues] - 1] = 1
+		upper_bounds = np.ones(shape=self.n ** 3)
+
+		with _structural_solver_lock:
+			solver, X = _structural_solver(self.n, self.box)
+			solver.SetNumThreads(num_threads)
+			self.C, self.lp_solution, self.status, time_spent = resolve_lp(solver, X, "BOP", lower_bounds, upper_bounds, time_limit=time_limit, stats=self.stats)
+		self._lpsolution2sudoku()
+		self.solved = True
+		return self.C, self.lp_solution, self.status, time_spent
+
+	def _reduced_linear_programming_solve(self, num_threads, time_limit, method):
+		"""
+		output:
+		------
+			Solves a model built with 'presolve=True', skipping the solver whenever
+			the presolve already solved (or proved infeasible) the sudoku, and maps
+			the reduced solution back to all the n ** 3 variables, so the outputs
+			are the same as the ones of 'self.linear_programming_solve'.
+		"""
+		fixed_vars = self.tableau['fixed_vars']
+		self.lp_solution = np.zeros(shape=self.n ** 3)
+		self.lp_solution[fixed_vars] = 1
+		time_spent = 0
+
+		if self.tableau['presolve_status'] == CONTRADICTION:
+			self.C, self.status = 0, STATUS_INFEASIBLE
+			self.stats.record('status', self.status)
+		elif self.tableau['presolve_status'] == SOLVED:
+			self.C, self.status = fixed_vars.shape[0], STATUS_OPTIMAL
+			self.stats.record('status', self.status)
+		else:
+			self.C, solution, self.status, time_spent = solve_lp(
+							C=self.tableau['obj_coeffs'],
+							A=self.tableau['constraint_coeffs'],
+							lb=self.tableau['lower_bounds'],
+							ub=self.tableau['upper_bounds'],
+							vars_properties=self._vars_properties(method),
 							maximization=False,
-							method="BOP",
-							num_threads=9,
-								)
+							method=method,
+							num_threads=num_threads,
+							time_limit=time_limit,
+							stats=self.stats,
+								)[:4]
+			self.C += fixed_vars.shape[0]
+			self.lp_solution[self.tableau['var_index']] = solution
+
 		self._lpsolution2sudoku()
 		self.solved = True
 		return self.C, self.lp_solution, self.status, time_spent
 
+	def _vars_properties(self, method):
+		"""
+		output:
+		------
+			* returns the 'vars_properties' given to 'solve_lp' for the given method,
+				where every variable of the current tableau is binary;
+		"""
+		if method.upper() != 'CBC':
+			return {}
+		return {k: (VAR_TYPE_BINARY, 0, 1) for k in range(0, self.tableau['num_vars'])}
+
+	def _label(self, engine):
+		"""
+		output:
+		------
+			* labels the instrumentation of this sudoku with the engine solving it,
+				unless an engine was already set;
+		"""
+		if self.stats.enabled:
+			self.stats.labels.setdefault('engine', engine)
+
+	def solve(self, engine=None, num_threads=9, cache=None, time_limit=None):
+		"""
+		input:
+		-----
+			* engine: a non-casesensitive string which defines how to solve the sudoku,
+				defaults to None, where 'default_engine(n)' is used:
+				* 'bitmask': a native exact cover search (see 'exact_cover.search'),
+					the fastest engine for 9-sudokus and 16-sudokus, which may however
+					take arbitrarily long on sparse puzzles of larger sizes;
+				* 'lp': the linear programming model, solved by
+					'self.linear_programming_solve'; if no model was built yet, or if
+					the sudoku changed since it was built, a sparse and presolved one
+					gets built first;
+				* 'cpsat': the CP-SAT solver, stating the sudoku constraints natively
+					(see 'constraint_programming.solve_cp'), which scales best to
+					large sudokus;
+				* 'large': the memory-bounded mode for large sudokus (such as 36-sudokus and
+					49-sudokus), see 'self._large_solve';
+				* 'portfolio': races the 'bitmask', 'cpsat', BOP and CBC engines, each
+					in its own process, keeping the first proven result and
+					terminating the others (see 'portfolio.race'), where the winning
+					engine is kept in 'self.winner';
+			* num_threads: the number of threads used by the 'lp' engine, or the number
+				of parallel search workers used by the 'cpsat' engine;
+			* cache: a 'solution_cache.SolutionCache', defaults to None; if given, the
+				engine only runs when neither this sudoku nor any of its transformed
+				versions were solved before, in which case its solution gets cached;
+			* time_limit: the maximum wall-clock time, in milliseconds, given to the
+				engine, defaults to None (no limit); whenever it's reached, the status
+				is 'STATUS_NOT_SOLVED' (or 'STATUS_FEASIBLE' if the 'lp' engine found
+				a solution it didn't prove optimal yet);
+		output:
+		------
+			The same outputs of 'self.linear_programming_solve':
+			* the objective function C
+			* the binary 1D solution numpy array, indexed by 'self.indexing_encoder'
+			* the status of the optimization (for instance, it could be infeasible)
+			* the time spent to find the solution, measured in milliseconds
+		"""
+		if engine is None:
+			engine = default_engine(self.n)
+		self._label(engine.lower())
+		if cache is not None:
+			start = time.perf_counter()
+			with self.stats.phase('cache'):
+				solution = cache.get(self.sudoku, self.box)
+			self.stats.record('cache_hit', solution is not None)
+			if solution is not None:
+				return self._set_solution(solution, int(round((time.perf_counter() - start) * 1000)))
+			puzzle = self.sudoku.copy()
+			result = self.solve(engine, num_threads, time_limit=time_limit)
+			if self.status == STATUS_OPTIMAL:
+				cache.put(puzzle, self.sudoku, self.box)
+			return result
+
+		if engine.lower() == 'lp':
+			if not self.tableau or not np.array_equal(self.tableau['sudoku'], self.sudoku):
+				self.linear_programming_model(sparse=True, presolve=True)
+			return self.linear_programming_solve(num_threads=num_threads, time_limit=time_limit)
+		elif engine.lower() == 'cpsat':
+			solution, status, time_spent = solve_cp(self.sudoku, self.box, time_limit=time_limit, num_workers=num_threads, stats=self.stats)
+			return self._set_solution(solution, time_spent, status)
+		elif engine.lower() == 'large':
+			return self._large_solve(num_threads, time_limit)
+		elif engine.lower() == 'portfolio':
+			# imported here, since the portfolio runs its engines through this class
+			from portfolio import race
+			with self.stats.phase('search'):
+				self.winner, solution, status, time_spent = race(self.sudoku, time_limit=time_limit, box=self.box)
+			self.stats.record('winner', self.winner)
+			self.stats.record('status', status)
+			return self._set_solution(solution, time_spent, status)
+		elif engine.lower() != 'bitmask':
+			raise Exception('Unsupported engine:', engine)
+
+		start = time.perf_counter()
+		try:
+			with self.stats.phase('search'):
+				solution = next(search(self.sudoku, self.box, time_limit=time_limit), None)
+		except TimeLimitReached:
+			self.stats.record('status', STATUS_NOT_SOLVED)
+			return self._set_solution(None, int(round((time.perf_counter() - start) * 1000)), STATUS_NOT_SOLVED)
+		return self._set_solution(solution, int(round((time.perf_counter() - start) * 1000)))
+
+	def _large_solve(self, num_threads, time_limit):
+		"""
+		output:
+		------
+			Solves the sudoku by propagating it first ('self.presolve'), and then
+			handing the candidates left to the CP-SAT solver, whose model only holds a
+			variable per candidate and a native constraint per cell and per digit of
+			each unit, so no dense n ** 3 model is ever built (the naked pairs and
+			pointing rules are left out, since they hardly remove any candidate of
+			such puzzles); the outputs are the same as the ones of
+			'self.linear_programming_solve'.
+			Notice that this bounds the memory used rather than the time spent: on a
+			single core, 36-sudokus keeping 40% to 45% of a full grid as clues were
+			solved within 1 to 10 seconds, while 49-sudokus keeping 40% of it took
+			from 30 seconds to more than a minute.
+		"""
+		start = time.perf_counter()
+		grid, candidates, status = self.presolve()
+		presolve_time = int(round((time.perf_counter() - start) * 1000))
+		if status == CONTRADICTION:
+			return self._set_solution(None, presolve_time)
+		if status == SOLVED:
+			return self._set_solution(grid, presolve_time)
+		solution, status, time_spent = solve_cp(grid, self.box, candidates=candidates, time_limit=time_limit, num_workers=num_threads, stats=self.stats)
+		return self._set_solution(solution, presolve_time + time_spent, status)
+
+	def _set_solution(self, solution, time_spent, status=None):
+		"""
+		output:
+		------
+			Writes the solution (a 2D NumPy array, or None if none was found) found by
+			an engine other than the linear programming one to this object, returning
+			the same outputs as 'self.linear_programming_solve'; unless given, the
+			status is optimal when there's a solution or infeasible otherwise.
+		"""
+		self.lp_solution = np.zeros(shape=self.n ** 3)
+		if solution is None:
+			self.C, self.status = 0, STATUS_INFEASIBLE if status is None else status
+		else:
+			self.lp_solution[np.arange(self.n ** 2) * self.n + solution.ravel() - 1] = 1
+			self.C, self.status = self.n ** 2, STATUS_OPTIMAL if status is None else status
+		if status is None:
+			self.stats.record('status', self.status)
+		self._lpsolution2sudoku()
+		self.solved = True
+		return self.C, self.lp_solution, self.status, time_spent
 
 if __name__ == '__main__':
 	'''
@@ -231,7 +623,7 @@ if __name__ == '__main__':
 		s = Sudoku(n=k ** 2)
 		print('A starting {:d}-Sudoku state:'.format(k))
 		print(s.get_puzzle_state())
-		s.linear_programming_model()
+		s.linear_programming_model(sparse=True)
 		_, _, _, t = s.linear_programming_solve()
 		print()
 		print('The solved {:d}-Sudoku state:'.format(k))
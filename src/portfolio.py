@@ -0,0 +1,189 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Races several engines over the same n-sudoku, each one in its own
+	process, taking the first proven result and terminating the others,
+	so the time spent on a puzzle is bounded by the best engine for it
+	rather than by the worst one. The winners are counted for each n, so
+	the best default engine of each size may be learned over time.
+	---------------------------------------------------------------
+'''
+from nsudoku import Sudoku
+from linear_programming_solver import STATUS_OPTIMAL, STATUS_FEASIBLE, STATUS_INFEASIBLE, STATUS_NOT_SOLVED
+from collections import Counter
+from multiprocessing import forkserver
+from threading import Lock
+import multiprocessing
+import os
+import queue
+import time
+
+
+# the engines raced by default: the native search, CP-SAT and the 'solve_lp' methods
+PORTFOLIO = ('bitmask', 'cpsat', 'bop', 'cbc')
+# the statuses which end a race: a solution, or a proof that there's none
+PROVEN = (STATUS_OPTIMAL, STATUS_FEASIBLE, STATUS_INFEASIBLE)
+
+# how many races each engine won, keyed by (n, engine)
+wins = Counter()
+_wins_lock = Lock()
+
+_forkserver_lock = Lock()
+# the directory of this file, holding the modules imported by the engine processes
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def process_context(start_method=None):
+	'''
+	output:
+	------
+		* returns the multiprocessing context used to run the engines (and the workers
+			of 'service.SolverService'), 'start_method' defaulting to 'forkserver'
+			whenever the platform supports it, whose server imports the solvers once,
+			so each process is forked from it in a few milliseconds (rather than
+			importing the solvers anew, as 'spawn' does, which is used otherwise);
+			'fork' is the cheapest of all, but is unsafe whenever the calling process
+			already runs threads (such as the OR-Tools or asyncio executor ones), so
+			it's only used if asked for;
+	'''
+	if start_method is None:
+		start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+	context = multiprocessing.get_context(start_method)
+	if start_method == 'forkserver':
+		_start_forkserver(context)
+	return context
+
+
+def _start_forkserver(context):
+	'''
+	output:
+	------
+		* starts the forkserver (unless it's running already), preloading the solvers,
+			where this directory is added to the 'PYTHONPATH' of the server, since it
+			ignores the 'sys.path' of its parent (and silently skips the modules it
+			can't import) on some python versions;
+	'''
+	with _forkserver_lock:
+		context.set_forkserver_preload(['nsudoku'])
+		python_path = os.environ.get('PYTHONPATH')
+		os.environ['PYTHONPATH'] = os.pathsep.join(path for path in (_DIRECTORY, python_path) if path)
+		try:
+			forkserver.ensure_running()
+		finally:
+			if python_path is None:
+				del os.environ['PYTHONPATH']
+			else:
+				os.environ['PYTHONPATH'] = python_path
+
+
+def _run_engine(engine, grid, time_limit, box, results):
+	'''
+	output:
+	------
+		* solves 'grid' with a single engine, putting a 4-uple (engine, solved sudoku
+			state or None, status, time spent in milliseconds) on the 'results' queue;
+			'bop' and 'cbc' solve the (sparse and presolved) linear programming model
+			with the matching 'solve_lp' method;
+	'''
+	sudoku = Sudoku(grid.copy(), n=grid.shape[0], box_shape=box)
+	if engine in ('bop', 'cbc'):
+		sudoku.linear_programming_model(sparse=True, presolve=True)
+		_, _, status, time_spent = sudoku.linear_programming_solve(num_threads=1, time_limit=time_limit, method=engine.upper())
+	else:
+		_, _, status, time_spent = sudoku.solve(engine, num_threads=1, time_limit=time_limit)
+	solution = sudoku.get_puzzle_state() if status in (STATUS_OPTIMAL, STATUS_FEASIBLE) else None
+	results.put((engine, solution, status, time_spent))
+
+
+def race(grid, engines=PORTFOLIO, time_limit=None, box=None, start_method=None):
+	'''
+	input:
+	-----
+		* grid: the sudoku state as a 2D NumPy array, where 0 marks an empty cell;
+		* engines: the engines raced, any of 'bitmask', 'cpsat', 'bop' and 'cbc';
+		* time_limit: the maximum wall-clock time, in milliseconds, given to the race
+			(and to each engine), defaults to None (no limit);
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+		* start_method: the multiprocessing start method of the engine processes,
+			defaults to None ('forkserver' or 'spawn', see 'process_context');
+	output:
+	------
+		* the engine which won the race, or None if no engine proved a result;
+		* the solved sudoku state as a 2D NumPy array, or None if there's none;
+		* the status of the winner (or 'STATUS_NOT_SOLVED' if there's no winner);
+		* the wall-clock time spent on the race, measured in milliseconds;
+		the engines still running once a result is proven get terminated, and the
+		win is counted on 'wins';
+	'''
+	engines = [engine.lower() for engine in engines]
+	unknown = [engine for engine in engines if engine not in PORTFOLIO]
+	if unknown:
+		raise Exception('Unsupported portfolio engines:', unknown)
+
+	start = time.perf_counter()
+	context = process_context(start_method)
+	results = context.Queue()
+	processes = [context.Process(target=_run_engine, args=(engine, grid, time_limit, box, results), daemon=True) for engine in engines]
+	for process in processes:
+		process.start()
+
+	winner, solution, status = None, None, STATUS_NOT_SOLVED
+	try:
+		for _ in range(0, len(processes)):
+			timeout = None
+			if time_limit is not None:
+				timeout = max(0, time_limit / 1000 - (time.perf_counter() - start))
+			try:
+				engine, engine_solution, engine_status, _ = _next_result(results, processes, timeout)
+			except queue.Empty:
+				break
+			if engine_status in PROVEN:
+				winner, solution, status = engine, engine_solution, engine_status
+				break
+	finally:
+		for process in processes:
+			if process.is_alive():
+				process.terminate()
+		for process in processes:
+			process.join()
+		results.close()
+
+	if winner is not None:
+		with _wins_lock:
+			wins[(grid.shape[0], winner)] += 1
+	return winner, solution, status, int(round((time.perf_counter() - start) * 1000))
+
+
+def best_engine(n, default='bitmask'):
+	'''
+	output:
+	------
+		* returns the engine which won the most races of n-sudokus so far, or 'default'
+			if no n-sudoku was raced yet;
+	'''
+	with _wins_lock:
+		counts = [(count, engine) for (size, engine), count in wins.items() if size == n]
+	if not counts:
+		return default
+	return max(counts)[1]
+
+
+def _next_result(results, processes, timeout):
+	'''
+	output:
+	------
+		* returns the next result put on the 'results' queue, waiting at most 'timeout'
+			seconds (or forever, if it's None); raises 'queue.Empty' if it times out or
+			if every engine process died without leaving a result;
+	'''
+	deadline = None if timeout is None else time.perf_counter() + timeout
+	while True:
+		wait = 0.05 if deadline is None else min(0.05, deadline - time.perf_counter())
+		if wait <= 0:
+			raise queue.Empty
+		try:
+			return results.get(timeout=wait)
+		except queue.Empty:
+			if not any(process.is_alive() for process in processes) and results.empty():
+				raise
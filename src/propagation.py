@@ -0,0 +1,222 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Constraint propagation over the candidates of an n-sudoku, used to
+	fix as many cells as possible before any solver gets called.
+	---------------------------------------------------------------
+'''
+from sudoku_structure import units, cell_units
+import numpy as np
+
+
+SOLVED = 0
+STUCK = 1
+CONTRADICTION = 2
+
+
+def candidates(grid, box=None):
+	'''
+	output:
+	------
+		* returns a (n, n, n) boolean NumPy array, where item (i, j, k) tells whether
+			the digit k + 1 may still be placed on cell (i, j) without repeating
+			any of the digits already found in 'grid'. Filled cells hold a single
+			candidate: their own digit;
+	'''
+	n = grid.shape[0]
+	flat = grid.ravel()
+	placed = _one_hot(flat, n)
+	unit_has = placed[units(n, box)].any(axis=1)
+	blocked = unit_has[cell_units(n, box)].any(axis=1)
+	result = np.where((flat == 0)[:, None], ~blocked, placed)
+	return result.reshape(n, n, n)
+
+
+def candidates_many(grids, box=None):
+	'''
+	output:
+	------
+		* returns a (batch, n, n, n) boolean NumPy array holding the 'candidates' of
+			each sudoku state of the (batch, n, n) NumPy array 'grids';
+	'''
+	batch, n = grids.shape[0], grids.shape[1]
+	flat = grids.reshape(batch, n * n)
+	placed = flat[:, :, None] == np.arange(1, n + 1)
+	unit_has = placed[:, units(n, box)].any(axis=2)
+	blocked = unit_has[:, cell_units(n, box)].any(axis=2)
+	result = np.where((flat == 0)[:, :, None], ~blocked, placed)
+	return result.reshape(batch, n, n, n)
+
+
+def propagate_many(grids, box=None):
+	'''
+	Applies the naked singles and hidden singles rules, until a fixpoint is reached,
+	to a whole stack of puzzles at once, each rule being a reduction of the candidates
+	along the rows, columns and boxes of every puzzle still changing.
+	input:
+	-----
+		* grids: a (batch, n, n) NumPy array of sudoku states, where 0 marks an empty cell;
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+	output:
+	------
+		* a copy of 'grids' with every cell fixed by propagation filled in;
+		* the remaining candidates as a (batch, n, n, n) boolean NumPy array (see
+			'candidates_many'), indexed just like 'Sudoku.indexing_encoder';
+		* a 1D NumPy array holding, for each puzzle, SOLVED, STUCK or CONTRADICTION,
+			just like the status returned by 'propagate';
+	'''
+	grids = np.asarray(grids)
+	batch, n = grids.shape[0], grids.shape[1]
+	unit_cells = units(n, box)
+	flat = grids.reshape(batch, n * n).astype(int)
+	cand = candidates_many(grids, box).reshape(batch, n * n, n)
+	status = np.full(shape=batch, fill_value=STUCK, dtype=np.int8)
+	active = np.arange(batch)
+
+	while active.shape[0] > 0:
+		f, c = flat[active], cand[active]
+		empty = f == 0
+		placed = f[:, :, None] == np.arange(1, n + 1)
+		unit_cand = c[:, unit_cells]
+		counts = unit_cand.sum(axis=2)
+		failed = (placed[:, unit_cells].sum(axis=2) > 1).any(axis=(1, 2))
+		failed |= (counts == 0).any(axis=(1, 2)) | (empty & ~c.any(axis=2)).any(axis=1)
+
+		# naked singles: empty cells with a single candidate
+		proposed = c & (c.sum(axis=2) == 1)[:, :, None]
+		# hidden singles: digits with a single candidate cell within an unit, where the
+		# rows, columns and boxes are each a permutation of the cells
+		hidden = unit_cand & (counts == 1)[:, :, None, :]
+		for t in range(0, 3):
+			scattered = np.zeros_like(proposed)
+			scattered[:, unit_cells[t * n:(t + 1) * n].ravel()] = hidden[:, t * n:(t + 1) * n].reshape(-1, n * n, n)
+			proposed |= scattered
+		proposed &= empty[:, :, None]
+
+		# a cell proposed two different digits is a contradiction as well
+		num_proposed = proposed.sum(axis=2)
+		failed |= (num_proposed > 1).any(axis=1)
+		assign = (num_proposed == 1) & ~failed[:, None]
+		f[assign] = proposed.argmax(axis=2)[assign] + 1
+		changed = assign.any(axis=1)
+		if changed.any():
+			c[changed] &= candidates_many(f[changed].reshape(-1, n, n), box).reshape(-1, n * n, n)
+		flat[active], cand[active] = f, c
+
+		status[active[failed]] = CONTRADICTION
+		done = active[~failed & ~changed]
+		status[done[(flat[done] != 0).all(axis=1)]] = SOLVED
+		active = active[~failed & changed]
+
+	return flat.reshape(batch, n, n), cand.reshape(batch, n, n, n), status
+
+
+def propagate(grid, box=None, pairs=False):
+	'''
+	Applies, until a fixpoint is reached, the naked singles and hidden singles rules
+	(and, optionally, the naked pairs and pointing rules) to the given puzzle.
+	input:
+	-----
+		* grid: the sudoku state as a 2D NumPy array, where 0 marks an empty cell;
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+		* pairs: True to also apply the naked pairs and pointing rules, which are
+			slower but may fix cells the singles rules can't;
+	output:
+	------
+		* a copy of 'grid' with every cell fixed by propagation filled in;
+		* the remaining candidates as a (n, n, n) boolean NumPy array (see 'candidates');
+		* SOLVED if every cell got filled, CONTRADICTION if the puzzle was proven
+			infeasible or STUCK otherwise;
+	'''
+	n = grid.shape[0]
+	unit_cells = units(n, box)
+	flat = np.array(grid, dtype=int).ravel()
+	cand = candidates(flat.reshape(n, n), box).reshape(n * n, n)
+
+	while True:
+		empty = flat == 0
+		if (_one_hot(flat, n)[unit_cells].sum(axis=1) > 1).any():
+			return flat.reshape(n, n), cand.reshape(n, n, n), CONTRADICTION
+		unit_cand = cand[unit_cells]
+		counts = unit_cand.sum(axis=1)
+		if (counts == 0).any() or (cand[empty].sum(axis=1) == 0).any():
+			return flat.reshape(n, n), cand.reshape(n, n, n), CONTRADICTION
+
+		# naked singles: empty cells with a single candidate
+		naked = np.flatnonzero(empty & (cand.sum(axis=1) == 1))
+		# hidden singles: digits with a single candidate cell within an unit
+		u, k = np.nonzero(counts == 1)
+		hidden = unit_cells[u, unit_cand[u, :, k].argmax(axis=1)]
+		keep = empty[hidden]
+		cells = np.concatenate([naked, hidden[keep]])
+		digits = np.concatenate([cand[naked].argmax(axis=1), k[keep]])
+
+		if cells.shape[0] > 0:
+			assignments = np.unique(np.stack([cells, digits]), axis=1)
+			if np.unique(assignments[0]).shape[0] != assignments.shape[1]:
+				return flat.reshape(n, n), cand.reshape(n, n, n), CONTRADICTION
+			flat[assignments[0]] = assignments[1] + 1
+			cand &= candidates(flat.reshape(n, n), box).reshape(n * n, n)
+		elif not (pairs and (_naked_pairs(cand, empty, unit_cells) | _pointing(cand, empty, unit_cells, n))):
+			break
+
+	status = SOLVED if (flat != 0).all() else STUCK
+	return flat.reshape(n, n), cand.reshape(n, n, n), status
+
+
+def _one_hot(flat, n):
+	'''
+	output:
+	------
+		* returns a (n * n, n) boolean NumPy array marking the digit of each filled cell;
+	'''
+	return flat[:, None] == np.arange(1, n + 1)
+
+
+def _naked_pairs(cand, empty, unit_cells):
+	'''
+	output:
+	------
+		* removes, in place, the digits of every naked pair from the other cells of
+			its unit and returns True if any candidate got removed;
+	'''
+	changed = False
+	for cells in unit_cells:
+		bivalue = cells[empty[cells] & (cand[cells].sum(axis=1) == 2)]
+		seen = {}
+		for cell in bivalue:
+			key = cand[cell].tobytes()
+			if key in seen:
+				others = cells[empty[cells] & (cells != cell) & (cells != seen[key])]
+				digits = cand[cell]
+				if cand[others][:, digits].any():
+					cand[np.ix_(others, np.flatnonzero(digits))] = False
+					changed = True
+			else:
+				seen[key] = cell
+	return changed
+
+
+def _pointing(cand, empty, unit_cells, n):
+	'''
+	output:
+	------
+		* removes, in place, a digit from a row (or column) whenever all of its candidate
+			cells within a box lie on that row (or column), returning True if any
+			candidate got removed;
+	'''
+	changed = False
+	for cells in unit_cells[2 * n:]:
+		for k in range(0, n):
+			spots = cells[empty[cells] & cand[cells, k]]
+			if spots.shape[0] < 2:
+				continue
+			for line, unit in ((spots // n, 0), (spots % n, n)):
+				if (line == line[0]).all():
+					others = unit_cells[unit + line[0]]
+					others = others[empty[others] & ~np.isin(others, cells)]
+					if cand[others, k].any():
+						cand[others, k] = False
+						changed = True
+	return changed
@@ -0,0 +1,364 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	An asyncio front-end to the n-sudoku engines: puzzles are solved by a
+	pool of worker processes, fed through a bounded queue (so a burst of
+	requests waits for room instead of piling up without limit), where
+	identical puzzles in flight at the same time share a single solve and
+	each request's deadline becomes the solver's time limit (which every
+	engine honors, so a worker is never kept busy past the deadline).
+
+	It may also be run as a line-based TCP server, where each request is a
+	puzzle in the format of 'sudoku_io' (optionally followed by a space and
+	a deadline in milliseconds) and each response is the solved puzzle, in
+	the same format, or a line starting with 'ERROR':
+
+	usage: python service.py [--host 127.0.0.1] [--port 8765] [--workers 4]
+		[--max-pending 64] [--engine cpsat]
+	---------------------------------------------------------------
+'''
+from nsudoku import Sudoku
+from portfolio import process_context
+from linear_programming_solver import STATUS_OPTIMAL, STATUS_FEASIBLE
+from sudoku_io import read_puzzles, write_puzzles
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import weakref
+
+
+def _solve(grid, engine, num_threads, time_limit):
+	'''
+	output:
+	------
+		* solves the puzzle within a worker process, returning a 3-uple (solved sudoku
+			state or None, status, time spent in milliseconds);
+	'''
+	sudoku = Sudoku(grid.astype(int), n=grid.shape[0])
+	_, _, status, time_spent = sudoku.solve(engine=engine, num_threads=num_threads, time_limit=time_limit)
+	solution = sudoku.get_puzzle_state() if status in (STATUS_OPTIMAL, STATUS_FEASIBLE) else None
+	return solution, status, time_spent
+
+
+class SolverService:
+	"""
+	Solves puzzles on behalf of asyncio code, through a pool of worker processes.
+	"""
+
+	def __init__(self, workers=None, max_pending=64, engine=None):
+		'''
+		input:
+		-----
+			* workers: the number of worker processes, defaults to the number of CPUs;
+			* max_pending: the maximum number of (distinct) puzzles waiting for a worker,
+				beyond which 'solve' waits for room in the queue;
+			* engine: the engine used by 'Sudoku.solve', defaults to None (the default
+				engine of each n, see 'nsudoku.default_engine');
+		'''
+		cpus = os.cpu_count() or 1
+		self.workers = cpus if workers is None or workers <= 0 else workers
+		self.num_threads = max(1, cpus // self.workers)
+		self.max_pending = max_pending
+		self.engine = engine
+		self.executor = None
+		self.queue = None
+		self.dispatchers = []
+		self.in_flight = {}
+
+	async def start(self):
+		'''
+		output:
+		------
+			* starts the worker processes and the tasks feeding them, where the workers
+				are started just like the engines of 'portfolio.race' (see
+				'portfolio.process_context'), rather than forked from this process,
+				which may run threads already;
+		'''
+		if self.executor is not None:
+			return
+		self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=process_context())
+		self.queue = asyncio.Queue(maxsize=self.max_pending)
+		self.dispatchers = [asyncio.ensure_future(self._dispatch()) for _ in range(0, self.workers)]
+
+	async def close(self):
+		'''
+		output:
+		------
+			* stops the tasks feeding the workers and shuts the worker processes down,
+				failing every request still waiting for a puzzle queued or being solved
+				(without blocking the event loop while the solves running on the workers
+				come to an end);
+		'''
+		if self.executor is None:
+			return
+		for dispatcher in self.dispatchers:
+			dispatcher.cancel()
+		await asyncio.gather(*self.dispatchers, return_exceptions=True)
+		while not self.queue.empty():
+			self.queue.get_nowait()
+			self.queue.task_done()
+		for pending in list(self.in_flight.values()):
+			if not pending.future.done():
+				pending.future.set_exception(Exception('The solver service was closed.'))
+		executor = self.executor
+		self.executor, self.queue, self.dispatchers = None, None, []
+		await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+	async def __aenter__(self):
+		await self.start()
+		return self
+
+	async def __aexit__(self, *exception):
+		await self.close()
+		return False
+
+	async def solve(self, grid, deadline=None):
+		'''
+		input:
+		-----
+			* grid: the sudoku state as a 2D NumPy array, where 0 marks an empty cell;
+			* deadline: the maximum time, in milliseconds, this request may take, both
+				waiting in the queue and solving, defaults to None (no deadline);
+		output:
+		------
+			* the solved sudoku state as a 2D NumPy array, or None if the engine found no
+				solution (for instance, if the time limit was reached);
+			* the status of the solve;
+			* the time spent by the engine, measured in milliseconds;
+			an identical puzzle already queued or being solved isn't solved again: the
+			request waits for its result instead, the solve being given the latest
+			deadline of the requests still waiting for it when a worker takes it;
+			raises 'asyncio.TimeoutError' if the deadline expires before a result is
+			found;
+		'''
+		if self.executor is None:
+			await self.start()
+		grid = np.asarray(grid)
+		key = (grid.shape, grid.astype(np.uint8).tobytes())
+		expires = None if deadline is None else time.monotonic() + deadline / 1000
+
+		pending = self.in_flight.get(key)
+		if pending is None:
+			pending = _Pending(grid, asyncio.get_running_loop().create_future())
+			self.in_flight[key] = pending
+			pending.future.add_done_callback(lambda done: self._forget(key, pending))
+		pending.deadlines.append(expires)
+		try:
+			while not pending.queued and not pending.future.done():
+				if pending.putting is None:
+					# this request puts the puzzle on the queue, waiting for room in it
+					# (backpressure) within its own deadline
+					pending.putting = asyncio.get_running_loop().create_future()
+					try:
+						await asyncio.wait_for(self.queue.put(pending), _remaining(expires))
+						pending.queued = True
+					finally:
+						pending.putting.set_result(None)
+						pending.putting = None
+				else:
+					# another request is putting it, which this one takes over if that
+					# request gives up before the puzzle gets queued
+					await asyncio.wait_for(asyncio.shield(pending.putting), _remaining(expires))
+			# shielded, so a request giving up doesn't cancel a solve other requests share
+			return await asyncio.wait_for(asyncio.shield(pending.future), _remaining(expires))
+		finally:
+			pending.deadlines.remove(expires)
+			if not pending.deadlines and not pending.queued and not pending.future.done():
+				# every request gave up before the puzzle got queued
+				pending.future.cancel()
+
+	def _forget(self, key, pending):
+		'''
+		output:
+		------
+			* removes a finished solve from the ones in flight, retrieving its exception
+				(if any), since every request waiting for it may have given up already;
+		'''
+		if self.in_flight.get(key) is pending:
+			del self.in_flight[key]
+		if not pending.future.cancelled():
+			pending.future.exception()
+
+	async def _dispatch(self):
+		'''
+		output:
+		------
+			* forever takes the next queued puzzle and solves it on a worker process,
+				giving the solver whatever is left of the latest deadline of the requests
+				waiting for it;
+		'''
+		loop = asyncio.get_running_loop()
+		while True:
+			pending = await self.queue.get()
+			future = pending.future
+			try:
+				if future.done():
+					continue
+				if not pending.deadlines:
+					# every request waiting for it gave up
+					future.cancel()
+					continue
+				time_limit = None
+				expires = pending.expires()
+				if expires is not None:
+					time_limit = int((expires - time.monotonic()) * 1000)
+					if time_limit <= 0:
+						future.set_exception(asyncio.TimeoutError())
+						continue
+				result = await loop.run_in_executor(self.executor, _solve, pending.grid, self.engine, self.num_threads, time_limit)
+				if not future.done():
+					future.set_result(result)
+			except asyncio.CancelledError:
+				# the service is closing, which fails the requests itself
+				raise
+			except Exception as exception:
+				if not future.done():
+					future.set_exception(exception)
+			finally:
+				self.queue.task_done()
+
+
+class _Pending:
+	"""
+	A puzzle in flight, i. e., queued or being solved, together with the deadlines of
+	the requests waiting for it.
+	"""
+	__slots__ = ('grid', 'future', 'deadlines', 'queued', 'putting')
+
+	def __init__(self, grid, future):
+		self.grid = grid
+		self.future = future
+		# the 'time.monotonic' deadline of each waiting request (None if it has none)
+		self.deadlines = []
+		self.queued = False
+		# resolved once the request putting the puzzle on the queue is done trying
+		self.putting = None
+
+	def expires(self):
+		'''
+		output:
+		------
+			* returns the latest deadline of the requests waiting for the puzzle, or None
+				if any of them has no deadline;
+		'''
+		if None in self.deadlines:
+			return None
+		return max(self.deadlines)
+
+
+# the service used by 'solve_async', one per event loop
+_default_services = weakref.WeakKeyDictionary()
+
+
+async def solve_async(grid, deadline=None):
+	'''
+	output:
+	------
+		* solves the puzzle with a 'SolverService' shared by the whole event loop
+			(created with its default settings on the first call made within that
+			loop), see 'SolverService.solve';
+	'''
+	loop = asyncio.get_running_loop()
+	for other in [other for other in _default_services if other.is_closed()]:
+		# the event loop is gone, so are the tasks feeding the workers of its service
+		_default_services.pop(other).executor.shutdown(wait=False)
+	service = _default_services.get(loop)
+	if service is None:
+		service = _default_services[loop] = SolverService()
+	return await service.solve(grid, deadline)
+
+
+def _remaining(expires):
+	'''
+	output:
+	------
+		* returns the seconds left until 'expires' (a 'time.monotonic' value), or None
+			if there's no deadline;
+	'''
+	if expires is None:
+		return None
+	return max(0, expires - time.monotonic())
+
+
+async def _handle(service, reader, writer):
+	'''
+	output:
+	------
+		* answers every line sent by a client of the TCP server, each request being
+			solved concurrently with the others while the responses keep its order;
+	'''
+	async def answer(line):
+		puzzle, _, deadline = line.strip().partition(b' ')
+		try:
+			grid = next(read_puzzles(io.BytesIO(puzzle)))[0]
+			solution, status, _ = await service.solve(grid, int(deadline) if deadline else None)
+			if solution is None:
+				return b'ERROR no solution found (status ' + str(status).encode('ascii') + b')\n'
+			output = io.BytesIO()
+			write_puzzles(output, [solution])
+			return output.getvalue()
+		except asyncio.TimeoutError:
+			return b'ERROR deadline expired\n'
+		except Exception as exception:
+			return b'ERROR ' + str(exception).encode('ascii', 'replace') + b'\n'
+
+	responses = asyncio.Queue()
+
+	async def respond():
+		while True:
+			response = await responses.get()
+			if response is None:
+				return
+			writer.write(await response)
+			await writer.drain()
+
+	responder = asyncio.ensure_future(respond())
+	try:
+		while True:
+			line = await reader.readline()
+			if not line:
+				break
+			if line.strip():
+				responses.put_nowait(asyncio.ensure_future(answer(line)))
+		responses.put_nowait(None)
+		await responder
+	finally:
+		responder.cancel()
+		writer.close()
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None, max_pending=64, engine=None):
+	'''
+	output:
+	------
+		* runs the line-based TCP server (see the header of this file) until cancelled;
+	'''
+	async with SolverService(workers, max_pending, engine) as service:
+		server = await asyncio.start_server(lambda reader, writer: _handle(service, reader, writer), host, port)
+		print('Serving n-sudoku requests on', ', '.join(str(socket.getsockname()) for socket in server.sockets))
+		async with server:
+			await server.serve_forever()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Serves n-sudoku solving requests over TCP, one puzzle per line.')
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=8765)
+	parser.add_argument('--workers', type=int, default=None, help='number of worker processes, defaults to the number of CPUs')
+	parser.add_argument('--max-pending', type=int, default=64, help='number of distinct puzzles which may wait for a worker')
+	parser.add_argument('--engine', default=None, help='the engine used by Sudoku.solve, defaults to the default engine of each n')
+	args = parser.parse_args(argv)
+	try:
+		asyncio.run(serve(args.host, args.port, args.workers, args.max_pending, args.engine))
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == '__main__':
+	main(sys.argv[1:])
@@ -0,0 +1,187 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	An incremental solving session for interactive play: the solver model
+	of a puzzle is built once and every move only tightens (or, when it's
+	undone, relaxes) the bounds of a single variable, the solver being
+	warm-started from the last solution found. Moves agreeing with that
+	solution are validated without calling the solver at all.
+	---------------------------------------------------------------
+'''
+from nsudoku import structural_solver
+from linear_programming_solver import resolve_lp, STATUS_OPTIMAL, STATUS_FEASIBLE, STATUS_INFEASIBLE
+from sudoku_structure import units, cell_units, box_shape as get_box_shape
+from propagation import candidates
+from instrumentation import NULL_STATS
+import numpy as np
+
+
+class SudokuSession:
+	"""
+	Keeps the solver model, the candidates (as bitmasks) and the last solution of a
+	sudoku while its empty cells get filled (and emptied) one move at a time.
+	"""
+
+	def __init__(self, sudoku, num_threads=1, time_limit=None, stats=None, box_shape=None):
+		'''
+		input:
+		-----
+			* sudoku: the initial state as a 2D NumPy array, where 0 marks an empty cell,
+				whose filled cells are kept as clues (which can't be moved);
+			* num_threads: the number of threads used by the solver;
+			* time_limit: the maximum wall-clock time, in milliseconds, given to each
+				solve, defaults to None (no limit);
+			* stats: an 'instrumentation.SolveStats', defaults to None (no instrumentation);
+			* box_shape: the (rows, columns) dimensions of each box, defaults to
+				'sudoku_structure.box_shape(n)';
+		'''
+		self.n = sudoku.shape[0]
+		self.box = get_box_shape(self.n, box_shape)
+		self.clues = np.array(sudoku, dtype=int)
+		self.grid = self.clues.copy()
+		self.time_limit = time_limit
+		self.stats = NULL_STATS if stats is None else stats
+		if self.stats.enabled:
+			self.stats.labels.setdefault('n', self.n)
+			self.stats.labels.setdefault('engine', 'session')
+
+		self.solver, self.X = structural_solver(self.n, num_threads, self.box)
+		for cell in np.flatnonzero(self.clues.ravel()).tolist():
+			self.X[cell * self.n + self.grid.item(cell) - 1].SetLb(1)
+
+		# the peers of a cell are the cells sharing a row, column or box with it
+		self.peers = units(self.n, self.box)[cell_units(self.n, self.box)].reshape(self.n * self.n, -1).tolist()
+		# bit k of masks[cell] tells whether the digit k + 1 fits the (empty) cell
+		bits = 1 << np.arange(self.n, dtype=object)
+		self.masks = candidates(self.grid, self.box).reshape(self.n * self.n, self.n).dot(bits).tolist()
+
+		self.history = []
+		self.lp_solution = None
+		self.solution = None
+		self.status = None
+		self._solve()
+
+	def place(self, i, j, v):
+		'''
+		input:
+		-----
+			* i, j: the row and column of an empty cell;
+			* v: the digit placed on it;
+		output:
+		------
+			* places the digit and returns True if the sudoku is still solvable, or False
+				otherwise (including whenever the time limit is reached before a
+				solution is found); the move is kept either way, so it may be undone;
+		Exceptions:
+		----------
+			Raises an exception of type "Exception" if the cell holds a clue or is
+			already filled, or if v isn't a digit between 1 and n.
+		'''
+		if not 1 <= v <= self.n:
+			raise Exception('Invalid digit for a ' + str(self.n) + '-sudoku:', v)
+		if self.clues[i, j] != 0:
+			raise Exception('The cell (' + str(i) + ', ' + str(j) + ') holds a clue.')
+		if self.grid[i, j] != 0:
+			raise Exception('The cell (' + str(i) + ', ' + str(j) + ') is already filled.')
+
+		cell = i * self.n + j
+		bit = 1 << (v - 1)
+		peers = self.peers[cell]
+		self.history.append((i, j, v, [self.masks[peer] for peer in peers], self.lp_solution, self.solution, self.status))
+
+		fits = self.masks[cell] & bit
+		self.grid[i, j] = v
+		self.X[cell * self.n + v - 1].SetLb(1)
+		for peer in peers:
+			self.masks[peer] &= ~bit
+
+		if not fits or self.status == STATUS_INFEASIBLE:
+			# the digit repeats within a unit, or a constraint was added to an infeasible model
+			self.lp_solution, self.solution, self.status = None, None, STATUS_INFEASIBLE
+			self.stats.record('status', self.status)
+		elif self.solution is not None and self.solution[i, j] == v:
+			# the last solution still holds, there's nothing left to solve
+			self.stats.record('solution_reused', True)
+		else:
+			self.stats.record('solution_reused', False)
+			self._solve()
+		return self.is_solvable()
+
+	def undo(self):
+		'''
+		output:
+		------
+			* empties the cell filled by the last move, restoring the session to the
+				state it was in before that move, and returns the move as (i, j, v);
+		Exceptions:
+		----------
+			Raises an exception of type "Exception" if there's no move to undo.
+		'''
+		if not self.history:
+			raise Exception('There\'s no move to undo.')
+		i, j, v, masks, self.lp_solution, self.solution, self.status = self.history.pop()
+		cell = i * self.n + j
+		self.grid[i, j] = 0
+		self.X[cell * self.n + v - 1].SetLb(0)
+		for peer, mask in zip(self.peers[cell], masks):
+			self.masks[peer] = mask
+		return i, j, v
+
+	def is_solvable(self):
+		'''
+		output:
+		------
+			* returns True if a solution of the sudoku, in its current state, is known;
+		'''
+		return self.status in (STATUS_OPTIMAL, STATUS_FEASIBLE) and self.solution is not None
+
+	def candidates(self, i, j):
+		'''
+		output:
+		------
+			* returns the list of digits which may be placed on the empty cell (i, j)
+				without repeating a digit within its row, column or box;
+		'''
+		mask = self.masks[i * self.n + j]
+		return [k + 1 for k in range(0, self.n) if mask >> k & 1]
+
+	def hint(self):
+		'''
+		output:
+		------
+			* returns a move (i, j, v) taken from the last solution found, on the empty
+				cell with the fewest candidates, or None if the sudoku isn't solvable or
+				has no empty cell left;
+		'''
+		if not self.is_solvable():
+			return None
+		empty = np.flatnonzero(self.grid.ravel() == 0).tolist()
+		if not empty:
+			return None
+		cell = min(empty, key=lambda cell: bin(self.masks[cell]).count('1'))
+		i, j = divmod(cell, self.n)
+		return i, j, int(self.solution[i, j])
+
+	def get_puzzle_state(self):
+		'''
+		output:
+		------
+			* returns a 2D NumPy array representing the sudoku in its current state;
+		'''
+		return self.grid
+
+	def _solve(self):
+		'''
+		output:
+		------
+			* solves the model, with the bounds currently set on its variables, starting
+				from the last solution found (if any), and decodes its solution;
+		'''
+		hint = [] if self.lp_solution is None else self.lp_solution.tolist()
+		_, lp_solution, self.status, _ = resolve_lp(self.solver, self.X, "BOP", hint=hint, time_limit=self.time_limit, stats=self.stats)
+		if self.status in (STATUS_OPTIMAL, STATUS_FEASIBLE):
+			self.lp_solution = lp_solution
+			self.solution = lp_solution.reshape(self.n, self.n, self.n).argmax(axis=2) + 1
+		else:
+			self.lp_solution, self.solution = None, None
@@ -0,0 +1,118 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	A persistent cache of solved n-sudokus, keyed by their canonical form
+	(see 'canonical.py'), so a puzzle is only solved once no matter how many
+	of its transformed versions are received afterwards.
+	---------------------------------------------------------------
+'''
+from canonical import canonical_form, apply_transform, invert_transform
+from sudoku_structure import box_shape
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+import sqlite3
+
+
+class SolutionCache:
+	"""
+	Solutions kept on a sqlite database, fronted by an in-memory least recently
+	used cache.
+	"""
+
+	def __init__(self, path=':memory:', capacity=4096):
+		'''
+		input:
+		-----
+			* path: the path to the sqlite database file, defaults to an in-memory
+				database (which isn't persistent);
+			* capacity: the maximum number of solutions kept in memory;
+		'''
+		self.capacity = capacity
+		self.memory = OrderedDict()
+		self.lock = Lock()
+		self.connection = sqlite3.connect(path, check_same_thread=False)
+		self.connection.execute('CREATE TABLE IF NOT EXISTS solutions (puzzle BLOB PRIMARY KEY, solution BLOB NOT NULL)')
+		self.connection.commit()
+
+	def get(self, grid, box=None):
+		'''
+		output:
+		------
+			* returns the cached solution of the given sudoku state (as a 2D NumPy
+				array), or None if neither it nor any of its transformed versions was
+				cached before;
+		'''
+		key, transform = canonical_form(grid, box)
+		solution = self._get(_database_key(key, box))
+		if solution is None:
+			return None
+		return invert_transform(np.frombuffer(solution, dtype=np.uint8).reshape(key.shape), transform).astype(grid.dtype)
+
+	def put(self, grid, solution, box=None):
+		'''
+		output:
+		------
+			* caches 'solution' as the solution of the given sudoku state (and, thus,
+				of all of its transformed versions);
+		'''
+		key, transform = canonical_form(grid, box)
+		self._put(_database_key(key, box), apply_transform(solution, transform).astype(np.uint8).tobytes())
+
+	def close(self):
+		'''
+		output:
+		------
+			* closes the sqlite database;
+		'''
+		self.connection.close()
+
+	def _get(self, key):
+		'''
+		output:
+		------
+			* returns the solution, as bytes, cached for the given canonical form;
+		'''
+		with self.lock:
+			if key in self.memory:
+				self.memory.move_to_end(key)
+				return self.memory[key]
+			row = self.connection.execute('SELECT solution FROM solutions WHERE puzzle = ?', (key,)).fetchone()
+			if row is None:
+				return None
+			self._remember(key, row[0])
+			return row[0]
+
+	def _put(self, key, solution):
+		'''
+		output:
+		------
+			* caches the solution, as bytes, of the given canonical form;
+		'''
+		with self.lock:
+			self.connection.execute('INSERT OR REPLACE INTO solutions (puzzle, solution) VALUES (?, ?)', (key, solution))
+			self.connection.commit()
+			self._remember(key, solution)
+
+	def _remember(self, key, solution):
+		'''
+		output:
+		------
+			* keeps the solution in memory, evicting the least recently used ones
+				beyond 'self.capacity';
+		'''
+		self.memory[key] = solution
+		self.memory.move_to_end(key)
+		while len(self.memory) > self.capacity:
+			self.memory.popitem(last=False)
+
+
+def _database_key(key, box):
+	'''
+	output:
+	------
+		* returns the bytes identifying a canonical form (and the shape of its boxes);
+	'''
+	box = box_shape(key.shape[0], box)
+	return bytes(box) + key.tobytes()
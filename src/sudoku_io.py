@@ -0,0 +1,118 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Streaming reader and writer for the usual one puzzle per line text
+	format, where each line lists the n * n cells of a puzzle in row-major
+	order (81 characters for a 9-sudoku), blanks being written as '0' or '.'.
+	---------------------------------------------------------------
+'''
+from itertools import islice
+import numpy as np
+
+
+# the k-th symbol stands for the digit k + 1, supporting up to n = 61
+ALPHABET = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BLANKS = '0.'
+
+
+def read_puzzles(file, n=None, batch_size=4096, alphabet=ALPHABET, blanks=BLANKS):
+	'''
+	input:
+	-----
+		* file: the path to the text file, or a file object opened in binary mode;
+		* n: the size of the puzzles, defaults to None, where it's inferred from the
+			length of the first line;
+		* batch_size: the (maximum) number of puzzles decoded at once;
+		* alphabet: the symbols of the digits 1, 2, ..., n, in this order;
+		* blanks: the symbols which mark an empty cell;
+	output:
+	------
+		* yields (batch, n, n) uint8 NumPy arrays, where 0 marks an empty cell, reading
+			at most 'batch_size' lines of the file at a time; empty lines are skipped;
+	Exceptions:
+	----------
+		Raises an exception of type "Exception" if a line has the wrong length or holds
+		a symbol which isn't a blank or one of the first n symbols of the alphabet.
+	'''
+	if isinstance(file, str):
+		with open(file, 'rb') as stream:
+			for puzzles in read_puzzles(stream, n, batch_size, alphabet, blanks):
+				yield puzzles
+		return
+
+	table = None
+	lines_read = 0
+	while True:
+		lines = [line.strip() for line in islice(file, batch_size)]
+		if not lines:
+			return
+		lines_read += len(lines)
+		lines = [line for line in lines if line]
+		if not lines:
+			continue
+		if n is None:
+			n = int(round(len(lines[0]) ** (1 / 2)))
+		if table is None:
+			table = _decoding_table(n, alphabet, blanks)
+
+		if any(len(line) != n * n for line in lines):
+			raise Exception('Puzzles of size n=' + str(n) + ' must have ' + str(n * n) + ' symbols per line, found a line with a different length before line ' + str(lines_read + 1) + '.')
+		puzzles = table[np.frombuffer(b''.join(lines), dtype=np.uint8)]
+		if (puzzles > n).any():
+			raise Exception('Unknown symbol found before line ' + str(lines_read + 1) + ' for puzzles of size n=' + str(n) + '.')
+		yield puzzles.reshape(len(lines), n, n)
+
+
+def write_puzzles(file, puzzles, alphabet=ALPHABET, blank='0'):
+	'''
+	input:
+	-----
+		* file: the path to the text file, or a file object opened in binary mode;
+		* puzzles: an iterable of sudoku states, either 2D NumPy arrays or (batch, n, n)
+			NumPy arrays, which is read lazily;
+		* alphabet: the symbols of the digits 1, 2, ..., n, in this order;
+		* blank: the symbol written for the empty cells;
+	output:
+	------
+		* writes each puzzle as a single line of 'file' and returns the number of
+			puzzles written;
+	'''
+	if isinstance(file, str):
+		with open(file, 'wb') as stream:
+			return write_puzzles(stream, puzzles, alphabet, blank)
+
+	written = 0
+	symbols = None
+	for batch in puzzles:
+		batch = np.asarray(batch)
+		if batch.ndim == 2:
+			batch = batch[None]
+		n = batch.shape[1]
+		if symbols is None or symbols.shape[0] != n + 1:
+			if n > len(alphabet):
+				raise Exception('The alphabet has too few symbols for puzzles of size n=' + str(n) + '.')
+			symbols = np.frombuffer((blank + alphabet[:n]).encode('ascii'), dtype=np.uint8)
+		lines = np.empty(shape=(batch.shape[0], n * n + 1), dtype=np.uint8)
+		lines[:, :-1] = symbols[batch.reshape(batch.shape[0], n * n)]
+		lines[:, -1] = ord('\n')
+		file.write(lines.tobytes())
+		written += batch.shape[0]
+	return written
+
+
+def _decoding_table(n, alphabet, blanks):
+	'''
+	output:
+	------
+		* returns a lookup table mapping each byte to its digit (0 for blanks), where
+			n + 1 flags the bytes which aren't valid symbols;
+	'''
+	if n > len(alphabet):
+		raise Exception('The alphabet has too few symbols for puzzles of size n=' + str(n) + '.')
+	table = np.full(shape=256, fill_value=n + 1, dtype=np.uint8)
+	for symbol in blanks:
+		table[ord(symbol)] = 0
+	for k, symbol in enumerate(alphabet[:n]):
+		table[ord(symbol)] = k + 1
+	return table
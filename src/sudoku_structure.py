@@ -0,0 +1,99 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Index arithmetic shared by every n-sudoku engine: the cells of an
+	n by n grid are numbered in row-major order (cell = i * n + j) and
+	the (cell, digit) pairs follow 'Sudoku.indexing_encoder', i. e.,
+	(i, j, k) maps to (i * n + j) * n + k.
+	---------------------------------------------------------------
+'''
+from functools import lru_cache
+import numpy as np
+
+
+def box_shape(n, box=None):
+	'''
+	output:
+	------
+		* returns the (rows, columns) dimensions of a single box of an n-sudoku: 'box'
+			itself, if given, or otherwise the most square boxes splitting the grid,
+			i. e., sqrt(n) by sqrt(n) boxes whenever n is a perfect square (a 9-sudoku
+			has 3 by 3 boxes), or else boxes with as many rows as the largest divisor of
+			n below sqrt(n) (a 6-sudoku has 2 by 3 boxes and a 12-sudoku 3 by 4 ones);
+	Exceptions:
+	----------
+		Raises an exception of type "Exception" if 'box' doesn't split an n by n grid,
+		or if it isn't given and n has no divisor between 2 and sqrt(n) (e. g., if n
+		is a prime number).
+	'''
+	if box is not None:
+		box_rows, box_cols = (int(size) for size in box)
+		if box_rows <= 0 or box_cols <= 0 or box_rows * box_cols != n:
+			raise Exception('[n-sudoku solver] boxes of ' + str(box_rows) + ' by ' + str(box_cols) + ' cells can\'t split a sudoku of size n=' + str(n) + '.')
+		return box_rows, box_cols
+	box_rows = max(rows for rows in range(1, int(n ** (1 / 2)) + 1) if n % rows == 0)
+	if box_rows == 1 and n > 1:
+		raise Exception('[n-sudoku solver] n=' + str(n) + ' can\'t be split into boxes, since it has no divisor between 2 and its square root "' + str(
+			(n ** (1 / 2))) + '".')
+	return box_rows, n // box_rows
+
+
+@lru_cache(maxsize=16)
+def units(n, box=None):
+	'''
+	output:
+	------
+		* returns a read-only (3 * n, n) NumPy array, where each line lists the cells of a
+			single unit: the first n lines are the rows of the grid, the next n lines are
+			its columns and the last n lines are its boxes;
+	'''
+	box_rows, box_cols = box_shape(n, box)
+	cells = np.arange(n * n).reshape(n, n)
+	boxes = cells.reshape(n // box_rows, box_rows, n // box_cols, box_cols).transpose(0, 2, 1, 3).reshape(n, n)
+	result = np.concatenate([cells, cells.T, boxes])
+	result.flags.writeable = False
+	return result
+
+
+@lru_cache(maxsize=16)
+def cell_units(n, box=None):
+	'''
+	output:
+	------
+		* returns a read-only (n * n, 3) NumPy array mapping each cell to the indexes (as
+			found in 'units') of its row, column and box;
+	'''
+	result = np.empty(shape=(n * n, 3), dtype=int)
+	for u, unit in enumerate(units(n, box)):
+		result[unit, u // n] = u
+	result.flags.writeable = False
+	return result
+
+
+@lru_cache(maxsize=8)
+def structural_coefficients(n, box=None):
+	'''
+	output:
+	------
+		* returns the row and column indexes, as two read-only 1D NumPy arrays, of the
+			nonzero coefficients (which are all 1) of the 4 * n ** 2 structural constraints
+			of the linear programming model, which depend on n alone:
+			* constraint u * n + k, for every unit u (see 'units') and digit k, forces
+				the digit k + 1 to be placed exactly once within that unit;
+			* constraint 3 * n ** 2 + cell forces a single digit on each cell;
+			the results are kept in a bounded, least recently used, cache;
+	'''
+	unit_cells = units(n, box)
+	digits = np.arange(n)
+	rows = np.concatenate([
+		np.repeat(np.arange(3 * n * n), n),
+		np.repeat(np.arange(3 * n * n, 4 * n * n), n),
+	])
+	cols = np.concatenate([
+		(unit_cells[:, None, :] * n + digits[None, :, None]).ravel(),
+		np.arange(n ** 3),
+	])
+	rows.flags.writeable = False
+	cols.flags.writeable = False
+	return rows, cols
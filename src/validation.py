@@ -0,0 +1,46 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+	---------------------------------------------------------------
+	Vectorized checks of filled n-sudokus, either a single grid or a
+	(batch, n, n) stack of them, in a handful of NumPy passes.
+	---------------------------------------------------------------
+'''
+from sudoku_structure import box_shape
+import numpy as np
+
+
+def is_valid(grids, clues=None, box=None):
+	'''
+	input:
+	-----
+		* grids: a filled sudoku as a 2D NumPy array, or a (batch, n, n) NumPy array
+			of filled sudokus;
+		* clues: the initial sudoku state(s), where 0 marks an empty cell, with the same
+			shape of 'grids' (or a single 2D state shared by all of them), defaults to
+			None, where the clues aren't checked;
+		* box: the (rows, columns) dimensions of a box, defaults to 'sudoku_structure.box_shape(n)';
+	output:
+	------
+		* returns, for each grid, whether every row, column and box holds each of the
+			digits 1, 2, ..., n exactly once and every clue is kept; a single bool is
+			returned for a single grid, or a 1D boolean NumPy array otherwise;
+	'''
+	grids = np.asarray(grids)
+	single = grids.ndim == 2
+	if single:
+		grids = grids[None]
+	batch, n = grids.shape[0], grids.shape[1]
+	box = box_shape(n, box)
+	box_rows, box_cols = box
+	digits = np.arange(1, n + 1)
+
+	boxes = grids.reshape(batch, n // box_rows, box_rows, n // box_cols, box_cols).transpose(0, 1, 3, 2, 4).reshape(batch, n, n)
+	valid = (np.sort(grids, axis=2) == digits).all(axis=(1, 2))
+	valid &= (np.sort(grids, axis=1) == digits[:, None]).all(axis=(1, 2))
+	valid &= (np.sort(boxes, axis=2) == digits).all(axis=(1, 2))
+	if clues is not None:
+		clues = np.asarray(clues)
+		valid &= ((clues == 0) | (clues == grids)).all(axis=(-2, -1))
+
+	return bool(valid[0]) if single else valid
@@ -0,0 +1,43 @@
+'''
+	Copyright 2020 Guilherme Mendes Marques de Oliveira
+	SPDX-License-Identifier: Apache-2.0
+'''
+import os
+import subprocess
+import sys
+import tempfile
+
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+# races twice, from a working directory other than 'src' and without it on the
+# PYTHONPATH, printing the wall-clock time of the second race (in seconds)
+SCRIPT = '''
+import sys
+sys.path.insert(0, {src!r})
+import time
+from generator import full_grid
+from portfolio import race
+import numpy as np
+
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	grid = full_grid(9, rng)
+	puzzle = np.where(rng.random(grid.shape) < 0.35, grid, 0).astype(int)
+	race(puzzle)
+	start = time.perf_counter()
+	winner, solution, _, _ = race(puzzle)
+	assert solution is not None, winner
+	print(time.perf_counter() - start)
+'''
+
+
+def test_race_is_warm_from_another_working_directory():
+	environment = dict(os.environ)
+	environment.pop('PYTHONPATH', None)
+	with tempfile.TemporaryDirectory() as directory:
+		script = os.path.join(directory, 'race.py')
+		with open(script, 'w') as output:
+			output.write(SCRIPT.format(src=os.path.abspath(SRC)))
+		result = subprocess.run([sys.executable, script], cwd=directory, env=environment, stdout=subprocess.PIPE, check=True, timeout=120)
+	assert float(result.stdout.decode().split()[-1]) < 1